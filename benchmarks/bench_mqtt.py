@@ -0,0 +1,51 @@
+"""Benchmark firing MQTT messages one by one against async_fire_mqtt_messages.
+
+Run with: pytest benchmarks/bench_mqtt.py -s
+"""
+import time
+
+import pytest
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+
+from pytest_homeassistant_custom_component.common import async_fire_mqtt_message
+from pytest_homeassistant_custom_component.fake_mqtt import async_fire_mqtt_messages
+from pytest_homeassistant_custom_component.typing import MqttMockHAClient
+
+MESSAGES = 50_000
+TOPICS = 500
+
+
+def _messages() -> list[tuple[str, str]]:
+    return [(f"bench/{i % TOPICS}", str(i)) for i in range(MESSAGES)]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+async def test_fire_mqtt_messages(
+    hass: HomeAssistant, mqtt_mock: MqttMockHAClient, batched: bool
+) -> None:
+    """Fire MESSAGES messages to a subscriber and print the throughput."""
+    received = 0
+
+    @callback
+    def record_message(msg: mqtt.ReceiveMessage) -> None:
+        nonlocal received
+        received += 1
+
+    await mqtt.async_subscribe(hass, "bench/+", record_message)
+    messages = _messages()
+
+    start = time.perf_counter()
+    if batched:
+        await async_fire_mqtt_messages(hass, messages, block_every=1000)
+    else:
+        for idx, (topic, payload) in enumerate(messages, 1):
+            async_fire_mqtt_message(hass, topic, payload)
+            if idx % 1000 == 0:
+                await hass.async_block_till_done()
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+
+    assert received == MESSAGES
+    name = "async_fire_mqtt_messages" if batched else "async_fire_mqtt_message loop"
+    print(f"\n{name}: {MESSAGES / elapsed:,.0f} msg/s ({elapsed:.3f}s)")
@@ -0,0 +1,68 @@
+"""Benchmark patching the disabled recorder tasks with autospec mocks or stubs.
+
+Run with: pytest benchmarks/bench_recorder_patches.py -s
+"""
+import itertools
+import timeit
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+from pytest_homeassistant_custom_component.recorder_fixtures import (
+    _recorder_migration_disabled,
+    _recorder_schema_validation_disabled,
+    _recorder_task_disabled,
+)
+
+RECORDER = "homeassistant.components.recorder"
+TARGETS = {
+    f"{RECORDER}.Recorder.async_nightly_tasks": _recorder_task_disabled,
+    f"{RECORDER}.Recorder.async_periodic_statistics": _recorder_task_disabled,
+    f"{RECORDER}.Recorder._schedule_compile_missing_statistics": (
+        _recorder_task_disabled
+    ),
+    f"{RECORDER}.migration._find_schema_errors": (
+        _recorder_schema_validation_disabled
+    ),
+    f"{RECORDER}.migration.EventsContextIDMigration.migrate_data": (
+        _recorder_migration_disabled
+    ),
+    f"{RECORDER}.migration.StatesContextIDMigration.migrate_data": (
+        _recorder_migration_disabled
+    ),
+    f"{RECORDER}.migration.EventTypeIDMigration.migrate_data": (
+        _recorder_migration_disabled
+    ),
+    f"{RECORDER}.migration.EntityIDMigration.migrate_data": (
+        _recorder_migration_disabled
+    ),
+}
+
+
+def _patch_autospec() -> None:
+    with ExitStack() as stack:
+        for target, stub in TARGETS.items():
+            side_effect = (
+                itertools.repeat(set())
+                if stub is _recorder_schema_validation_disabled
+                else None
+            )
+            stack.enter_context(patch(target, side_effect=side_effect, autospec=True))
+
+
+def _patch_stubs() -> None:
+    with ExitStack() as stack:
+        for target, stub in TARGETS.items():
+            stack.enter_context(patch(target, new=stub))
+
+
+@pytest.mark.parametrize("autospec", [True, False])
+def test_patch_recorder_tasks(autospec: bool) -> None:
+    """Enter and exit the patches and print the best time per test of 5 runs."""
+    func = _patch_autospec if autospec else _patch_stubs
+    number = 50 if autospec else 500
+    func()
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    name = "autospec mocks" if autospec else "stubs"
+    print(f"\n{name}: {best * 1000:.3f} ms per test")
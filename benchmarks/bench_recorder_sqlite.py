@@ -0,0 +1,47 @@
+"""Benchmark recording states to an on disk SQLite database with and without tuning.
+
+Run with: pytest benchmarks/bench_recorder_sqlite.py -s
+Add --recorder-db-dir=/dev/shm to compare with the databases on a tmpfs.
+"""
+import time
+
+import pytest
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+from pytest_homeassistant_custom_component.typing import RecorderInstanceContextManager
+
+STATES = 300
+
+
+@pytest.fixture
+def mock_recorder_before_hass(
+    async_test_recorder: RecorderInstanceContextManager,
+) -> None:
+    """Prepare the recorder database before the autouse fixtures set up hass."""
+
+
+@pytest.fixture
+def recorder_config() -> dict:
+    """Commit every state, like a test waiting for each one to be recorded."""
+    return {"commit_interval": 0}
+
+
+@pytest.mark.parametrize("persistent_database", [True])
+@pytest.mark.parametrize("recorder_sqlite_tuning", [False, True])
+async def test_record_states(
+    recorder_mock: Recorder, hass: HomeAssistant, recorder_sqlite_tuning: bool
+) -> None:
+    """Record STATES states one by one and print the time per state."""
+    await async_wait_recording_done(hass)
+    start = time.perf_counter()
+    for i in range(STATES):
+        hass.states.async_set("sensor.bench", str(i))
+        await async_wait_recording_done(hass)
+    elapsed = time.perf_counter() - start
+
+    name = "tuned" if recorder_sqlite_tuning else "recorder defaults"
+    print(f"\n{name}: {elapsed / STATES * 1000:.2f} ms per state")
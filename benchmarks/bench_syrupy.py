@@ -0,0 +1,58 @@
+"""Benchmark the per type preprocessor cache of the snapshot serializer.
+
+Run with: pytest benchmarks/bench_syrupy.py -s
+"""
+import dataclasses
+import timeit
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import State
+
+from pytest_homeassistant_custom_component import syrupy_cached
+from pytest_homeassistant_custom_component.syrupy_cached import (
+    CachedHomeAssistantSnapshotSerializer,
+)
+
+ENTITIES = 500
+
+
+class _NoCache(dict):
+    """Preprocessor cache which never stores, to run the type checks every time."""
+
+    def __setitem__(self, key, value) -> None:
+        pass
+
+
+@dataclasses.dataclass
+class _Data:
+    value: int
+    unit: str
+
+
+def _snapshot_data() -> dict:
+    return {
+        f"sensor.test_{i}": {
+            "state": State(f"sensor.test_{i}", str(i), {"unit": "W", "index": i}),
+            "data": [_Data(i, "W"), _Data(i + 1, "kW")],
+            "attributes": {"nested": {"values": list(range(5)), "name": f"Test {i}"}},
+        }
+        for i in range(ENTITIES)
+    }
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_serialize(cached: bool) -> None:
+    """Serialize ENTITIES entities and print the best of 5 runs."""
+    data = _snapshot_data()
+    cache = {} if cached else _NoCache()
+    with patch.object(syrupy_cached, "_TYPE_PREPROCESSORS", cache):
+        best = min(
+            timeit.repeat(
+                lambda: CachedHomeAssistantSnapshotSerializer.serialize(data),
+                number=1,
+                repeat=5,
+            )
+        )
+    name = "per type cache" if cached else "type checks per node"
+    print(f"\n{name}: {best * 1000:.1f} ms")
@@ -8,6 +8,7 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
 
 TO_REDACT = {}
 
@@ -22,3 +23,11 @@ async def async_get_config_entry_diagnostics(
     }
 
     return diagnostic_data
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a device."""
+
+    return {"name": device.name, "identifiers": list(device.identifiers)}
@@ -25,6 +25,24 @@ files = [
     "patch_recorder.py",
 ]
 
+# modules of this package which are not generated from homeassistant/core,
+# they are kept when the package is regenerated
+own_files = [
+    "diagnostics.py",
+    "fake_mqtt.py",
+    "garbage_collection.py",
+    "pytest_plugin.py",
+    "recorder_db.py",
+    "recorder_fixtures.py",
+    "recorder_history.py",
+    "restore_state.py",
+    "shared_cache.py",
+    "snapshot_platform.py",
+    "syrupy_cached.py",
+    "syrupy_compact.py",
+    "translations_cache.py",
+]
+
 # remove requirements for development only, i.e not related to homeassistant tests
 requirements_remove = [
     "ast-serialize",
@@ -4,6 +4,7 @@ import pathlib
 import re
 import shutil
 import os
+import tempfile
 
 import click
 
@@ -17,6 +18,7 @@ from const import (
     LICENSE_FILE_HA,
     LICENSE_FILE_NEW,
     files,
+    own_files,
     requirements_remove,
     HA_VERSION_FILE,
 )
@@ -24,6 +26,17 @@ from const import (
 @click.command
 @click.option("--regen/--no-regen", default=False, help="Whether to regenerate despite version")
 def cli(regen):
+    # keep the modules of this package, the generated ones are removed
+    own_files_dir = tempfile.mkdtemp()
+    try:
+        generate(regen, own_files_dir)
+    finally:
+        shutil.rmtree(own_files_dir)
+
+
+def generate(regen, own_files_dir):
+    for f in own_files:
+        shutil.copy2(os.path.join(PACKAGE_DIR, f), os.path.join(own_files_dir, f))
     if os.path.isdir(PACKAGE_DIR):
         shutil.rmtree(PACKAGE_DIR)
     if os.path.isfile(REQUIREMENTS_FILE):
@@ -260,6 +273,10 @@ def cli(regen):
         with open(os.path.join(PACKAGE_DIR, "components", "diagnostics", "__init__.py"), "w") as new_file:
             new_file.writelines(data)
 
+        # copy the modules of this package after the generated files are processed
+        for f in own_files:
+            shutil.copy2(os.path.join(own_files_dir, f), os.path.join(PACKAGE_DIR, f))
+
 
     if ha_version != current_version or regen:
         process_files()
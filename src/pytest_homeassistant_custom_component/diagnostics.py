@@ -0,0 +1,83 @@
+"""
+Diagnostics of many config entries or devices at once.
+
+get_diagnostics_for_config_entry and get_diagnostics_for_device of
+components/diagnostics set up diagnostics and create a client for each call.
+The helpers here do that once and fetch the diagnostics concurrently.
+"""
+
+import asyncio
+from collections.abc import Iterable, Mapping
+from http import HTTPStatus
+from typing import cast
+
+from homeassistant.components.diagnostics import DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.setup import async_setup_component
+from homeassistant.util.json import JsonObjectType
+
+from .typing import ClientSessionGenerator
+
+
+async def _get_diagnostics_bulk(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    urls: Mapping[str, str],
+) -> dict[str, JsonObjectType]:
+    """Return the diagnostics data for the urls, fetched concurrently."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+
+    async def _get(url: str) -> JsonObjectType:
+        response = await client.get(url)
+        assert response.status == HTTPStatus.OK, url
+        return cast(JsonObjectType, (await response.json())["data"])
+
+    results = await asyncio.gather(*(_get(url) for url in urls.values()))
+    return dict(zip(urls, results, strict=True))
+
+
+async def get_diagnostics_for_config_entries(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    config_entries: Iterable[ConfigEntry],
+) -> dict[str, JsonObjectType]:
+    """Return the diagnostics for the config entries keyed by entry id.
+
+    Diagnostics is set up and a client is created once for all config entries.
+    """
+    return await _get_diagnostics_bulk(
+        hass,
+        hass_client,
+        {
+            entry.entry_id: f"/api/diagnostics/config_entry/{entry.entry_id}"
+            for entry in config_entries
+        },
+    )
+
+
+async def get_diagnostics_for_devices(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    config_entry: ConfigEntry,
+    devices: Iterable[DeviceEntry],
+) -> dict[str, JsonObjectType]:
+    """Return the diagnostics for the devices keyed by device id.
+
+    Diagnostics is set up and a client is created once for all devices.
+    """
+    return await _get_diagnostics_bulk(
+        hass,
+        hass_client,
+        {
+            device.id: (
+                f"/api/diagnostics/config_entry/{config_entry.entry_id}"
+                f"/device/{device.id}"
+            )
+            for device in devices
+        },
+    )
@@ -0,0 +1,758 @@
+"""
+Lightweight fake of the paho MQTT client.
+
+FakeMqttClient implements the parts of the paho client used by the MQTT
+integration with plain methods instead of a MagicMock, so publishing thousands
+of messages does not create mock call records.
+
+MqttBroker emulates the broker behind the client: it keeps retained messages,
+matches published topics against the subscribed topic filters and counts the
+delivered and dropped messages.
+
+async_fire_mqtt_messages injects many messages into the MQTT integration at
+once. read_mqtt_capture and async_replay_mqtt_capture replay the traffic
+captured from a real broker.
+
+The fixtures set up MQTT with the fake client instead of the MagicMock of the
+generated plugins, or route the messages of that MagicMock through a MqttBroker
+returned by mqtt_broker.
+"""
+
+import asyncio
+import base64
+import os
+import time
+from collections.abc import Generator, Iterable
+from datetime import timedelta
+from typing import Any, NamedTuple
+from unittest.mock import Mock, patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.json import json_loads_object
+from paho.mqtt.client import MQTTMessage
+
+from .common import (
+    MockMqttReasonCode,
+    async_fire_mqtt_message,
+    async_fire_time_changed,
+)
+from .typing import MqttMockPahoClient
+
+MQTT_ERR_SUCCESS = 0
+
+_SUCCESS = MockMqttReasonCode()
+
+
+class _TopicTrieNode:
+    """Node of a topic trie holding one topic level."""
+
+    __slots__ = ("children", "topic_filter")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: dict[str, _TopicTrieNode] = {}
+        self.topic_filter: str | None = None
+
+
+class MqttTopicTrie:
+    """Topic filters stored per topic level to match topics with wildcards.
+
+    Matching a topic only visits the levels of the topic and the `+` and `#`
+    wildcards at each level, instead of testing every subscribed filter.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root = _TopicTrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of topic filters."""
+        return self._size
+
+    def __contains__(self, topic_filter: object) -> bool:
+        """Return if a topic filter was added."""
+        if not isinstance(topic_filter, str):
+            return False
+        node: _TopicTrieNode | None = self._root
+        for level in topic_filter.split("/"):
+            if (node := node.children.get(level)) is None:
+                return False
+        return node.topic_filter is not None
+
+    def add(self, topic_filter: str) -> None:
+        """Add a topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            if (child := node.children.get(level)) is None:
+                child = node.children[level] = _TopicTrieNode()
+            node = child
+        if node.topic_filter is None:
+            node.topic_filter = topic_filter
+            self._size += 1
+
+    def remove(self, topic_filter: str) -> bool:
+        """Remove a topic filter and return if it was added."""
+        path = [self._root]
+        levels = topic_filter.split("/")
+        for level in levels:
+            if (child := path[-1].children.get(level)) is None:
+                return False
+            path.append(child)
+        if path[-1].topic_filter is None:
+            return False
+        path[-1].topic_filter = None
+        self._size -= 1
+        # Prune the nodes which no longer lead to a topic filter
+        for level, node, parent in zip(
+            reversed(levels), reversed(path[1:]), reversed(path[:-1]), strict=True
+        ):
+            if node.children or node.topic_filter is not None:
+                break
+            del parent.children[level]
+        return True
+
+    def match(self, topic: str) -> list[str]:
+        """Return the topic filters matching a topic."""
+        levels = topic.split("/")
+        depth_max = len(levels)
+        # Wildcards at the first level do not match topics starting with $
+        system_topic = topic.startswith("$")
+        matched: list[str] = []
+        nodes = [(self._root, 0)]
+        while nodes:
+            node, depth = nodes.pop()
+            wildcards_allowed = depth or not system_topic
+            if (
+                wildcards_allowed
+                and (multi_level := node.children.get("#")) is not None
+                and multi_level.topic_filter is not None
+            ):
+                matched.append(multi_level.topic_filter)
+            if depth == depth_max:
+                if node.topic_filter is not None:
+                    matched.append(node.topic_filter)
+                continue
+            if (child := node.children.get(levels[depth])) is not None:
+                nodes.append((child, depth + 1))
+            if wildcards_allowed and (child := node.children.get("+")) is not None:
+                nodes.append((child, depth + 1))
+        return matched
+
+    def match_filter(self, topic_filter: str) -> list[str]:
+        """Return the added topics matched by a topic filter."""
+        levels = topic_filter.split("/")
+        depth_max = len(levels)
+        matched: list[str] = []
+        nodes = [(self._root, 0)]
+        while nodes:
+            node, depth = nodes.pop()
+            if depth == depth_max:
+                if node.topic_filter is not None:
+                    matched.append(node.topic_filter)
+                continue
+            level = levels[depth]
+            if level == "#":
+                # Matches the parent level and all levels below it
+                if depth and node.topic_filter is not None:
+                    matched.append(node.topic_filter)
+                subtree = [
+                    child
+                    for name, child in node.children.items()
+                    if depth or not name.startswith("$")
+                ]
+                while subtree:
+                    child = subtree.pop()
+                    if child.topic_filter is not None:
+                        matched.append(child.topic_filter)
+                    subtree.extend(child.children.values())
+            elif level == "+":
+                nodes.extend(
+                    (child, depth + 1)
+                    for name, child in node.children.items()
+                    if depth or not name.startswith("$")
+                )
+            elif (child := node.children.get(level)) is not None:
+                nodes.append((child, depth + 1))
+        return matched
+
+
+class RetainedMqttMessage(NamedTuple):
+    """A message retained by the broker."""
+
+    topic: str
+    payload: bytes
+    qos: int
+
+
+class MqttBroker:
+    """In-memory stand-in for a MQTT broker.
+
+    Messages published with retain are stored, and an empty retained payload
+    clears the stored message, like a real broker. A published message is
+    delivered when a subscribed topic filter matches its topic, otherwise it
+    is dropped. The retained messages returned on subscribe are counted as
+    delivered too.
+    """
+
+    __slots__ = (
+        "_retained_topics",
+        "delivered",
+        "dropped",
+        "retained",
+        "subscriptions",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the broker."""
+        self.subscriptions = MqttTopicTrie()
+        self.retained: dict[str, RetainedMqttMessage] = {}
+        self._retained_topics = MqttTopicTrie()
+        self.delivered = 0
+        self.dropped = 0
+
+    def publish(self, topic: str, payload: bytes, qos: int, retain: bool) -> bool:
+        """Handle a published message and return if it should be delivered."""
+        if retain:
+            if payload:
+                if topic not in self.retained:
+                    self._retained_topics.add(topic)
+                self.retained[topic] = RetainedMqttMessage(topic, payload, qos)
+            elif self.retained.pop(topic, None) is not None:
+                self._retained_topics.remove(topic)
+        if self.subscriptions.match(topic):
+            self.delivered += 1
+            return True
+        self.dropped += 1
+        return False
+
+    def subscribe(self, topic_filter: str) -> list[RetainedMqttMessage]:
+        """Subscribe to a topic filter and return the matching retained messages."""
+        self.subscriptions.add(topic_filter)
+        retained = [
+            self.retained[topic]
+            for topic in self._retained_topics.match_filter(topic_filter)
+        ]
+        self.delivered += len(retained)
+        return retained
+
+    def unsubscribe(self, topic_filter: str) -> None:
+        """Unsubscribe from a topic filter."""
+        self.subscriptions.remove(topic_filter)
+
+    def stats(self) -> dict[str, int]:
+        """Return the broker statistics."""
+        return {
+            "subscriptions": len(self.subscriptions),
+            "retained": len(self.retained),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def mqtt_topic_filters(topic: Any) -> list[str]:
+    """Return the topic filters of a subscribe or unsubscribe request."""
+    if isinstance(topic, str):
+        return [topic]
+    if isinstance(topic, tuple):
+        return [topic[0]]
+    return [item if isinstance(item, str) else item[0] for item in topic]
+
+
+def encode_mqtt_payload(payload: Any) -> bytes:
+    """Encode a payload like the paho client does."""
+    if payload is None:
+        return b""
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    if isinstance(payload, bytearray):
+        return bytes(payload)
+    return str(payload).encode("ascii")
+
+
+class _FakeSocket:
+    """Socket without a file descriptor."""
+
+    __slots__ = ()
+
+    def fileno(self) -> int:
+        """Return an invalid file descriptor so no reader or writer is added."""
+        return -1
+
+
+_FAKE_SOCKET = _FakeSocket()
+
+
+class FakeMqttMessageInfo:
+    """Result of a publish."""
+
+    __slots__ = ("mid", "rc")
+
+    def __init__(self, mid: int) -> None:
+        """Initialize the message info."""
+        self.mid = mid
+        self.rc = MQTT_ERR_SUCCESS
+
+
+class FakeMqttClient:
+    """Fake paho MQTT client.
+
+    The callbacks set by the MQTT integration are called the way the paho
+    client calls them, acknowledgements are scheduled on the event loop.
+    Messages are routed through a MqttBroker, retained messages matching a
+    new subscription are delivered after its acknowledgement.
+    When record_calls is set, calls are recorded in calls as
+    (name, args, kwargs) tuples which compare equal to unittest.mock.call
+    objects.
+    """
+
+    __slots__ = (
+        "_loop",
+        "_mid",
+        "broker",
+        "calls",
+        "connected",
+        "on_connect",
+        "on_disconnect",
+        "on_message",
+        "on_publish",
+        "on_socket_close",
+        "on_socket_open",
+        "on_socket_register_write",
+        "on_socket_unregister_write",
+        "on_subscribe",
+        "on_unsubscribe",
+        "published",
+        "suppress_exceptions",
+    )
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        record_calls: bool = False,
+        broker: MqttBroker | None = None,
+    ) -> None:
+        """Initialize the fake client."""
+        self._loop = loop
+        self._mid = 0
+        self.broker = broker or MqttBroker()
+        self.calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] | None = (
+            [] if record_calls else None
+        )
+        self.connected = False
+        self.published = 0
+        self.suppress_exceptions = False
+        self.on_connect: Any = None
+        self.on_disconnect: Any = None
+        self.on_message: Any = None
+        self.on_publish: Any = None
+        self.on_subscribe: Any = None
+        self.on_unsubscribe: Any = None
+        self.on_socket_open: Any = None
+        self.on_socket_close: Any = None
+        self.on_socket_register_write: Any = None
+        self.on_socket_unregister_write: Any = None
+
+    def _next_mid(self) -> int:
+        """Return the next message id."""
+        self._mid += 1
+        return self._mid
+
+    def _record(self, name: str, *args: Any, **kwargs: Any) -> None:
+        """Record a call if recording is enabled."""
+        if self.calls is not None:
+            self.calls.append((name, args, kwargs))
+
+    def setup(self) -> None:
+        """Set up the client."""
+
+    def enable_logger(self, *args: Any, **kwargs: Any) -> None:
+        """Enable logging."""
+
+    def username_pw_set(self, *args: Any, **kwargs: Any) -> None:
+        """Set the credentials."""
+        self._record("username_pw_set", *args, **kwargs)
+
+    def tls_set(self, *args: Any, **kwargs: Any) -> None:
+        """Set the TLS configuration."""
+        self._record("tls_set", *args, **kwargs)
+
+    def tls_insecure_set(self, *args: Any, **kwargs: Any) -> None:
+        """Set if the server certificate is verified."""
+        self._record("tls_insecure_set", *args, **kwargs)
+
+    def ws_set_options(self, *args: Any, **kwargs: Any) -> None:
+        """Set the websocket options."""
+        self._record("ws_set_options", *args, **kwargs)
+
+    def will_set(self, *args: Any, **kwargs: Any) -> None:
+        """Set the last will message."""
+        self._record("will_set", *args, **kwargs)
+
+    def connect(self, *args: Any, **kwargs: Any) -> int:
+        """Connect to the fake broker."""
+        self._record("connect", *args, **kwargs)
+        self.connected = True
+        self._loop.call_soon_threadsafe(self.on_connect, self, None, 0, _SUCCESS)
+        self.on_socket_open(self, None, _FAKE_SOCKET)
+        self.on_socket_register_write(self, None, _FAKE_SOCKET)
+        return MQTT_ERR_SUCCESS
+
+    def reconnect(self) -> int:
+        """Reconnect to the fake broker."""
+        self._record("reconnect")
+        self.connected = True
+        return MQTT_ERR_SUCCESS
+
+    def disconnect(self, *args: Any, **kwargs: Any) -> int:
+        """Disconnect from the fake broker."""
+        self._record("disconnect", *args, **kwargs)
+        self.connected = False
+        return MQTT_ERR_SUCCESS
+
+    def socket(self) -> _FakeSocket:
+        """Return the socket of the connection."""
+        return _FAKE_SOCKET
+
+    def want_write(self) -> bool:
+        """Return if there is data to write."""
+        return False
+
+    def loop_read(self, max_packets: int = 1) -> int:
+        """Read incoming packets."""
+        return MQTT_ERR_SUCCESS
+
+    def loop_write(self) -> int:
+        """Write outgoing packets."""
+        return MQTT_ERR_SUCCESS
+
+    def loop_misc(self) -> int:
+        """Handle keepalive and retries."""
+        return MQTT_ERR_SUCCESS
+
+    def deliver(
+        self,
+        topic: str,
+        payload: bytes,
+        qos: int = 0,
+        retain: bool = False,
+        properties: Any = None,
+    ) -> None:
+        """Pass a message to the MQTT integration."""
+        msg = MQTTMessage(topic=topic.encode("utf-8"))
+        msg.payload = payload
+        msg.qos = qos
+        msg.retain = retain
+        msg.timestamp = time.monotonic()
+        msg.properties = properties
+        self.on_message(self, None, msg)
+
+    def publish(
+        self,
+        topic: str,
+        payload: Any = None,
+        qos: int = 0,
+        retain: bool = False,
+        properties: Any = None,
+    ) -> FakeMqttMessageInfo:
+        """Publish a message, delivering it if its topic is subscribed."""
+        self._record("publish", topic, payload, qos, retain, properties)
+        self.published += 1
+        payload = encode_mqtt_payload(payload)
+        if self.broker.publish(topic, payload, qos, retain):
+            self.deliver(topic, payload, qos, retain, properties)
+        mid = self._next_mid()
+        self._loop.call_soon(self.on_publish, self, None, mid, _SUCCESS, None)
+        return FakeMqttMessageInfo(mid)
+
+    def subscribe(
+        self, topic: Any, qos: int = 0, options: Any = None, properties: Any = None
+    ) -> tuple[int, int]:
+        """Subscribe to one or more topic filters."""
+        self._record("subscribe", topic, qos, options, properties)
+        topic_filters = mqtt_topic_filters(topic)
+        retained = [
+            message
+            for topic_filter in topic_filters
+            for message in self.broker.subscribe(topic_filter)
+        ]
+        mid = self._next_mid()
+        self._loop.call_soon(
+            self.on_subscribe,
+            self,
+            None,
+            mid,
+            [_SUCCESS] * len(topic_filters),
+            None,
+        )
+        for message in retained:
+            self._loop.call_soon(
+                self.deliver, message.topic, message.payload, message.qos, True
+            )
+        return (MQTT_ERR_SUCCESS, mid)
+
+    def unsubscribe(self, topic: Any, properties: Any = None) -> tuple[int, int]:
+        """Unsubscribe from one or more topic filters."""
+        self._record("unsubscribe", topic, properties)
+        topic_filters = mqtt_topic_filters(topic)
+        for topic_filter in topic_filters:
+            self.broker.unsubscribe(topic_filter)
+        mid = self._next_mid()
+        self._loop.call_soon(
+            self.on_unsubscribe,
+            self,
+            None,
+            mid,
+            [_SUCCESS] * len(topic_filters),
+            None,
+        )
+        return (MQTT_ERR_SUCCESS, mid)
+
+
+async def async_fire_mqtt_messages(
+    hass: HomeAssistant,
+    messages: Iterable[tuple[str, bytes | str] | tuple[str, bytes | str, int, bool]],
+    qos: int = 0,
+    retain: bool = False,
+    block_every: int | None = None,
+) -> int:
+    """Fire a stream of MQTT messages and return the number of messages fired.
+
+    Unlike calling async_fire_mqtt_message in a loop, a single client argument
+    is used for all messages and encoded topics are reused. Messages are
+    (topic, payload) pairs sent with qos and retain, or (topic, payload, qos,
+    retain) tuples. They are consumed lazily, so messages can be a generator.
+    When block_every is set, hass.async_block_till_done is awaited after every
+    block_every messages.
+    """
+    from homeassistant.components.mqtt import MqttData
+
+    mqtt_data: MqttData = hass.data["mqtt"]
+    assert mqtt_data.client
+    on_message = mqtt_data.client._async_mqtt_on_message
+    mqttc = Mock()
+    encoded_topics: dict[str, bytes] = {}
+    fired = 0
+    for message in messages:
+        topic, payload = message[0], message[1]
+        if (encoded_topic := encoded_topics.get(topic)) is None:
+            encoded_topic = encoded_topics[topic] = topic.encode("utf-8")
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        msg = MQTTMessage(topic=encoded_topic)
+        msg.payload = payload
+        if len(message) == 4:
+            msg.qos = message[2]
+            msg.retain = message[3]
+        else:
+            msg.qos = qos
+            msg.retain = retain
+        msg.timestamp = time.monotonic()
+        on_message(mqttc, None, msg)
+        fired += 1
+        if block_every and fired % block_every == 0:
+            await hass.async_block_till_done()
+    return fired
+
+
+class MqttCaptureMessage(NamedTuple):
+    """A message captured from a MQTT broker."""
+
+    topic: str
+    payload: bytes
+    qos: int
+    retain: bool
+    timestamp: float
+
+
+def read_mqtt_capture(
+    capture_file: str | os.PathLike[str],
+) -> Generator[MqttCaptureMessage]:
+    """Read a MQTT capture file one message at a time.
+
+    The capture is a JSON lines file with one object per message holding the
+    topic, payload, qos, retain and timestamp in seconds. Binary payloads can
+    be stored base64 encoded as payload_base64 instead of payload.
+    """
+    with open(capture_file, encoding="utf-8") as capture:
+        for line in capture:
+            if not line.strip():
+                continue
+            record = json_loads_object(line)
+            if "payload_base64" in record:
+                payload = base64.b64decode(str(record["payload_base64"]))
+            else:
+                payload = record.get("payload")
+                if payload is None:
+                    payload = ""
+                elif not isinstance(payload, str):
+                    payload = json_dumps(payload)
+                payload = payload.encode("utf-8")
+            yield MqttCaptureMessage(
+                str(record["topic"]),
+                payload,
+                int(record.get("qos") or 0),  # type: ignore[arg-type]
+                bool(record.get("retain")),
+                float(record["timestamp"]),  # type: ignore[arg-type]
+            )
+
+
+async def async_replay_mqtt_capture(
+    hass: HomeAssistant,
+    messages: Iterable[MqttCaptureMessage],
+    freezer: FrozenDateTimeFactory | None = None,
+    speed: float = 1.0,
+) -> int:
+    """Replay captured MQTT messages and return the number of messages replayed.
+
+    Messages are consumed lazily, use read_mqtt_capture to stream a capture
+    file. They are fired with async_fire_mqtt_messages. When a freezer is
+    passed, the frozen clock is moved forward by the time between two messages
+    divided by speed, and time changed listeners are fired, before each message
+    with a later timestamp.
+    """
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive, got {speed}")
+    if freezer is None:
+        replayed = await async_fire_mqtt_messages(
+            hass,
+            (
+                (message.topic, message.payload, message.qos, message.retain)
+                for message in messages
+            ),
+        )
+        await hass.async_block_till_done()
+        return replayed
+
+    previous_timestamp: float | None = None
+    batch: list[tuple[str, bytes, int, bool]] = []
+    replayed = 0
+    for message in messages:
+        if (
+            previous_timestamp is not None
+            and (delay := (message.timestamp - previous_timestamp) / speed) > 0
+        ):
+            replayed += await async_fire_mqtt_messages(hass, batch)
+            batch.clear()
+            freezer.tick(timedelta(seconds=delay))
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done()
+        previous_timestamp = message.timestamp
+        batch.append((message.topic, message.payload, message.qos, message.retain))
+    replayed += await async_fire_mqtt_messages(hass, batch)
+    await hass.async_block_till_done()
+    return replayed
+
+
+@pytest.fixture
+def mqtt_broker() -> MqttBroker | None:
+    """Fixture to allow emulating a MQTT broker.
+
+    Return a MqttBroker to only deliver published messages to subscribed
+    topics and to deliver retained messages on subscribe.
+    """
+    return None
+
+
+@pytest.fixture
+def mqtt_client_mock(
+    hass: HomeAssistant,
+    mqtt_client_mock: MqttMockPahoClient,
+    mqtt_broker: MqttBroker | None,
+) -> MqttMockPahoClient:
+    """Fixture to route the messages of the MQTT client mock through a broker.
+
+    Overrides the fixture of the generated plugins, which delivers every
+    published message. When mqtt_broker returns a MqttBroker, the publish,
+    subscribe and unsubscribe side effects are replaced by ones passing
+    through the broker. They share their own message ids, as the ids given
+    by the generated side effects are not reachable.
+    """
+    if mqtt_broker is None:
+        return mqtt_client_mock
+
+    mid = 0
+
+    def get_mid() -> int:
+        nonlocal mid
+        mid += 1
+        return mid
+
+    @callback
+    def _publish(topic, payload, qos, retain, properties=None):
+        payload = encode_mqtt_payload(payload)
+        if mqtt_broker.publish(topic, payload, qos, retain):
+            async_fire_mqtt_message(
+                hass, topic, payload, qos, retain, properties=properties
+            )
+        mid = get_mid()
+        hass.loop.call_soon(mqtt_client_mock.on_publish, Mock(), 0, mid, _SUCCESS, None)
+        return FakeMqttMessageInfo(mid)
+
+    def _subscribe(topic_or_list, qos=0, **kwargs):
+        mid = get_mid()
+        hass.loop.call_soon(
+            mqtt_client_mock.on_subscribe, Mock(), 0, mid, [_SUCCESS], None
+        )
+        for topic_filter in mqtt_topic_filters(topic_or_list):
+            for message in mqtt_broker.subscribe(topic_filter):
+                hass.loop.call_soon(
+                    async_fire_mqtt_message,
+                    hass,
+                    message.topic,
+                    message.payload,
+                    message.qos,
+                    True,
+                )
+        return (0, mid)
+
+    def _unsubscribe(topic):
+        for topic_filter in mqtt_topic_filters(topic):
+            mqtt_broker.unsubscribe(topic_filter)
+        mid = get_mid()
+        hass.loop.call_soon(
+            mqtt_client_mock.on_unsubscribe, Mock(), 0, mid, [_SUCCESS], None
+        )
+        return (0, mid)
+
+    mqtt_client_mock.publish.side_effect = _publish
+    mqtt_client_mock.subscribe.side_effect = _subscribe
+    mqtt_client_mock.unsubscribe.side_effect = _unsubscribe
+    return mqtt_client_mock
+
+
+@pytest.fixture
+def mqtt_fake_client_record_calls() -> bool:
+    """Fixture to allow recording the calls made to mqtt_fake_client."""
+    return False
+
+
+@pytest.fixture
+def mqtt_fake_client(
+    hass: HomeAssistant,
+    mqtt_broker: MqttBroker | None,
+    mqtt_fake_client_record_calls: bool,
+) -> Generator[FakeMqttClient]:
+    """Fixture to fake the MQTT client without a MagicMock.
+
+    A lighter alternative to mqtt_client_mock for tests publishing many
+    messages. Published messages are always routed through a MqttBroker,
+    the one returned by mqtt_broker if any. To set up MQTT with it, override
+    mqtt_client_mock:
+
+    @pytest.fixture
+    def mqtt_client_mock(mqtt_fake_client: FakeMqttClient) -> FakeMqttClient:
+        return mqtt_fake_client
+    """
+    client = FakeMqttClient(hass.loop, mqtt_fake_client_record_calls, mqtt_broker)
+    with patch(
+        "homeassistant.components.mqtt.client.AsyncMQTTClient", return_value=client
+    ):
+        yield client
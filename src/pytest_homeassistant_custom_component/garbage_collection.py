@@ -0,0 +1,197 @@
+"""
+Configurable garbage collection for test sessions.
+
+The generated plugins collect garbage and freeze the survivors once per test
+module. The options here collect per number of tests or per allocated memory
+instead, and report the time spent in garbage collection.
+"""
+
+import argparse
+import gc
+import sys
+import time
+
+import pytest
+
+GC_POLICY_MODULE = "module"
+GC_POLICY_TESTS = "tests"
+GC_POLICY_ALLOCATED = "allocated"
+
+
+class GarbageCollectionStats:
+    """Decide when to collect garbage and keep track of the time it costs.
+
+    Explicit collections are run by the garbage_collection fixtures according
+    to the policy. Automatic collections triggered by the interpreter are only
+    measured when gc_callback has been registered in gc.callbacks.
+    """
+
+    def __init__(
+        self, policy: str, interval: int, allocated_blocks: int, freeze: bool = True
+    ) -> None:
+        """Initialize the garbage collection stats."""
+        self.policy = policy
+        self.freeze = freeze
+        self.interval = max(interval, 1)
+        self.allocated_blocks = allocated_blocks
+        self.collections = 0
+        self.collect_time = 0.0
+        self.collected = 0
+        self.automatic_collections = 0
+        self.automatic_time = 0.0
+        self._explicit = False
+        self._automatic_start = 0.0
+        self._tests_since_collect = 0
+        self._blocks_at_collect = sys.getallocatedblocks()
+
+    def collect_and_freeze(self) -> None:
+        """Run a full collection and move the survivors to the permanent generation.
+
+        The survivors are only frozen when freeze is set.
+        """
+        self._explicit = True
+        start = time.perf_counter()
+        try:
+            self.collected += gc.collect()
+            if self.freeze:
+                gc.freeze()
+        finally:
+            self._explicit = False
+        self.collect_time += time.perf_counter() - start
+        self.collections += 1
+        self._tests_since_collect = 0
+        self._blocks_at_collect = sys.getallocatedblocks()
+
+    def before_test(self) -> None:
+        """Collect before a test if the policy asks for it."""
+        if self.policy == GC_POLICY_TESTS:
+            if self._tests_since_collect % self.interval == 0:
+                self.collect_and_freeze()
+            self._tests_since_collect += 1
+        elif self.policy == GC_POLICY_ALLOCATED:
+            allocated = sys.getallocatedblocks() - self._blocks_at_collect
+            if allocated >= self.allocated_blocks or not self.collections:
+                self.collect_and_freeze()
+
+    def gc_callback(self, phase: str, info: dict[str, int]) -> None:
+        """Measure collections which were not started by collect_and_freeze."""
+        if self._explicit:
+            return
+        if phase == "start":
+            self._automatic_start = time.perf_counter()
+            return
+        self.automatic_time += time.perf_counter() - self._automatic_start
+        self.automatic_collections += 1
+
+    def summary(self) -> list[str]:
+        """Return a human readable summary of the garbage collection cost."""
+        lines = [
+            f"policy: {self.policy}",
+            (
+                f"explicit collections: {self.collections}"
+                f" ({self.collect_time:.3f}s, {self.collected} objects collected)"
+            ),
+            f"frozen objects: {gc.get_freeze_count()}",
+        ]
+        if self.automatic_collections:
+            lines.append(
+                f"automatic collections: {self.automatic_collections}"
+                f" ({self.automatic_time:.3f}s)"
+            )
+        return lines
+
+
+GC_STATS_KEY = pytest.StashKey[GarbageCollectionStats]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the garbage collection options."""
+    parser.addoption(
+        "--gc-policy",
+        action="store",
+        default=GC_POLICY_MODULE,
+        choices=(GC_POLICY_MODULE, GC_POLICY_TESTS, GC_POLICY_ALLOCATED),
+        help="When to run the garbage collection and freeze the survivors",
+    )
+    parser.addoption(
+        "--gc-interval",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of tests between collections for the 'tests' gc policy",
+    )
+    parser.addoption(
+        "--gc-allocated-blocks",
+        action="store",
+        type=int,
+        default=1_000_000,
+        help="Allocated memory blocks between collections for the 'allocated' policy",
+    )
+    parser.addoption(
+        "--gc-report",
+        action="store_true",
+        default=False,
+        help="Report time spent in garbage collection at the end of the session",
+    )
+    parser.addoption(
+        "--gc-freeze",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Freeze the objects surviving the explicit collections",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the garbage collection stats of the session."""
+    gc_stats = GarbageCollectionStats(
+        config.getoption("gc_policy"),
+        config.getoption("gc_interval"),
+        config.getoption("gc_allocated_blocks"),
+        config.getoption("gc_freeze"),
+    )
+    if config.getoption("gc_report"):
+        gc.callbacks.append(gc_stats.gc_callback)
+    config.stash[GC_STATS_KEY] = gc_stats
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Remove the gc instrumentation and the frozen objects."""
+    if (gc_stats := config.stash.get(GC_STATS_KEY, None)) is None:
+        return
+    if gc_stats.gc_callback in gc.callbacks:
+        gc.callbacks.remove(gc_stats.gc_callback)
+    if gc_stats.freeze:
+        gc.unfreeze()
+
+
+def pytest_terminal_summary(
+    terminalreporter: pytest.TerminalReporter, config: pytest.Config
+) -> None:
+    """Report the cost of garbage collection if requested."""
+    if config.getoption("gc_report"):
+        terminalreporter.section("garbage collection")
+        for line in config.stash[GC_STATS_KEY].summary():
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def garbage_collection(pytestconfig: pytest.Config) -> None:
+    """Run garbage collection at known locations.
+
+    Overrides the fixture of the generated plugins, which collects and freezes
+    the survivors once per module. Use --gc-policy to collect every
+    --gc-interval tests or after --gc-allocated-blocks memory blocks have been
+    allocated instead, and --no-gc-freeze to keep the survivors out of the
+    permanent generation.
+    """
+    gc_stats = pytestconfig.stash[GC_STATS_KEY]
+    if gc_stats.policy == GC_POLICY_MODULE:
+        gc_stats.collect_and_freeze()
+
+
+@pytest.fixture(autouse=True)
+def garbage_collection_per_test(pytestconfig: pytest.Config) -> None:
+    """Run garbage collection before a test when not collecting per module."""
+    gc_stats = pytestconfig.stash[GC_STATS_KEY]
+    if gc_stats.policy != GC_POLICY_MODULE:
+        gc_stats.before_test()
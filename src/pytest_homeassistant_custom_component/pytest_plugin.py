@@ -0,0 +1,20 @@
+"""
+Entry point of the pytest plugins of this package.
+
+plugins.py is generated from the conftest.py of homeassistant/core and is not
+changed here. The other plugins are registered after it, in this order, so
+their fixtures can override the generated ones of the same name. syrupy is
+registered first, otherwise it could be loaded after this package and its
+snapshot fixture would override the ones here.
+"""
+
+pytest_plugins = [
+    "syrupy",
+    "pytest_homeassistant_custom_component.plugins",
+    "pytest_homeassistant_custom_component.garbage_collection",
+    "pytest_homeassistant_custom_component.translations_cache",
+    "pytest_homeassistant_custom_component.fake_mqtt",
+    "pytest_homeassistant_custom_component.syrupy_cached",
+    "pytest_homeassistant_custom_component.syrupy_compact",
+    "pytest_homeassistant_custom_component.recorder_fixtures",
+]
@@ -0,0 +1,157 @@
+"""
+Faster recorder test databases.
+
+The recorder creates the tables of every new test database. New SQLite
+databases can be cloned from a template holding the tables of the schema
+instead, the template is created once per test session and schema module.
+The fixtures of recorder_fixtures.py use these helpers, tests of migrations
+from old schemas can use create_engine_test_with_db_template and
+old_db_schema instead of the ones of components/recorder/common.py.
+setup_connection_with_sqlite_tuning trades durability for speed on the
+temporary on disk SQLite databases.
+"""
+
+import importlib
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.const import SupportedDialect
+from homeassistant.components.recorder.models import DatabaseEngine
+from homeassistant.components.recorder.util import (
+    execute_on_connection,
+    setup_connection_for_dialect,
+)
+from homeassistant.core import HomeAssistant
+from sqlalchemy import Engine, create_engine
+from sqlalchemy import event as sqlalchemy_event
+from sqlalchemy.engine.interfaces import DBAPIConnection
+
+from .components.recorder import common as recorder_common
+from .components.recorder import db_schema_0
+
+DB_SCHEMA_MODULE = "homeassistant.components.recorder.db_schema"
+SETUP_CONNECTION_TARGET = (
+    "homeassistant.components.recorder.core.setup_connection_for_dialect"
+)
+
+# Test databases are thrown away, they don't need to survive a crash or power
+# loss. The recorder already enables WAL, but syncs each commit with a commit
+# interval of 0 which tests use.
+SQLITE_TEST_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+_DB_TEMPLATES: dict[str, sqlite3.Connection] = {}
+
+
+def get_db_template(schema_module: str) -> sqlite3.Connection:
+    """Return an in memory SQLite database with the tables of a schema module.
+
+    The template is created once per test session and only holds the schema,
+    rows such as the schema version are still written by each test.
+    """
+    if (template := _DB_TEMPLATES.get(schema_module)) is None:
+        engine = create_engine("sqlite://")
+        importlib.import_module(schema_module).Base.metadata.create_all(engine)
+        template = sqlite3.connect(":memory:", check_same_thread=False)
+        with engine.connect() as connection:
+            connection.connection.dbapi_connection.backup(template)
+        engine.dispose()
+        _DB_TEMPLATES[schema_module] = template
+    return template
+
+
+def _clone_db_template(
+    template: sqlite3.Connection, dbapi_connection: Any, connection_record: Any
+) -> None:
+    """Copy a template into a new connection unless its database has tables."""
+    if dbapi_connection.execute("SELECT 1 FROM sqlite_master").fetchone() is None:
+        template.backup(dbapi_connection)
+
+
+def attach_db_template(engine: Engine, schema_module: str) -> None:
+    """Clone the template of a schema module into new SQLite databases.
+
+    Other databases are left alone, their tables are created as usual.
+    """
+    if engine.dialect.name == "sqlite":
+        sqlalchemy_event.listen(
+            engine,
+            "connect",
+            partial(_clone_db_template, get_db_template(schema_module)),
+            insert=True,
+        )
+
+
+def _create_engine_from_db_template(schema_module: str, *args, **kwargs) -> Engine:
+    """Create an engine cloning the template of a schema module."""
+    engine = create_engine(*args, **kwargs)
+    attach_db_template(engine, schema_module)
+    return engine
+
+
+def create_engine_with_db_template(*args, **kwargs):
+    """Test version of create_engine that clones the current schema.
+
+    This saves creating the tables of a new SQLite database in each test, the
+    recorder still initializes the database as if it had created the tables.
+    """
+    return _create_engine_from_db_template(DB_SCHEMA_MODULE, *args, **kwargs)
+
+
+def create_engine_test_with_db_template(*args, **kwargs):
+    """Test version of create_engine that initializes with old schema.
+
+    Like create_engine_test of components/recorder/common.py, with the tables
+    cloned from a template.
+    """
+    engine = _create_engine_from_db_template(db_schema_0.__name__, *args, **kwargs)
+    db_schema_0.Base.metadata.create_all(engine)
+    return engine
+
+
+@contextmanager
+def old_db_schema(hass: HomeAssistant, schema_version_postfix: str) -> Iterator[None]:
+    """Initialize the db with the old schema, cloned from a template.
+
+    Wraps old_db_schema of components/recorder/common.py, the tables of the
+    schema module returned by get_schema_module_path are cloned from a
+    template. Only the missing tables are created afterwards.
+    """
+    schema_module = recorder_common.get_schema_module_path(schema_version_postfix)
+    with (
+        recorder_common.old_db_schema(hass, schema_version_postfix),
+        patch.object(
+            recorder_common,
+            "create_engine",
+            partial(_create_engine_from_db_template, schema_module),
+        ),
+    ):
+        yield
+
+
+def setup_connection_with_sqlite_tuning(
+    instance: Recorder,
+    dialect_name: str,
+    dbapi_connection: DBAPIConnection,
+    first_connection: bool,
+) -> DatabaseEngine | None:
+    """Set up a recorder connection, tuning SQLite for test databases.
+
+    Replaces setup_connection_for_dialect, the SQLite pragmas are executed
+    after the recorder's own ones to override them.
+    """
+    database_engine = setup_connection_for_dialect(
+        instance, dialect_name, dbapi_connection, first_connection
+    )
+    if dialect_name == SupportedDialect.SQLITE:
+        for pragma in SQLITE_TEST_PRAGMAS:
+            execute_on_connection(dbapi_connection, pragma)
+    return database_engine
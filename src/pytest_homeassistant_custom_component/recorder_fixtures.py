@@ -0,0 +1,403 @@
+"""
+Recorder fixtures overriding and extending the generated plugins.
+
+async_test_recorder overrides the fixture of the generated plugins to clone
+new SQLite databases from a template, see recorder_db.py.
+recorder_commit_tracker waits for specific events to be committed, see
+recorder_history.py. The recorder and SQLAlchemy are imported when the
+fixtures are used, like in the generated plugins, so tests which don't use
+the recorder don't pay for them. Disabled recorder tasks and migrations are
+patched with plain stubs instead of autospec mocks. recorder_sessions counts
+the recorder sessions and checks they are not nested. The --recorder-db-dir
+option and recorder_sqlite_tuning speed up on disk SQLite databases.
+"""
+
+import pathlib
+import tempfile
+import threading
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
+from shutil import rmtree
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers.typing import ConfigType
+
+from . import patch_recorder
+from .plugins import _async_init_recorder_component, thread_session
+from .typing import RecorderInstanceContextManager
+
+if TYPE_CHECKING:
+    from homeassistant.components import recorder
+    from sqlalchemy.orm.session import Session
+
+    from .recorder_history import RecorderCommitTracker
+
+
+# Replacements for disabled recorder tasks and migrations. They are patched in
+# directly instead of with autospec mocks, which inspect signatures every test.
+def _recorder_task_disabled(*args: Any, **kwargs: Any) -> None:
+    """Do nothing instead of a disabled recorder task."""
+
+
+def _recorder_migration_disabled(*args: Any, **kwargs: Any) -> bool:
+    """Report a disabled data migration as completed."""
+    return True
+
+
+def _recorder_schema_validation_disabled(*args: Any, **kwargs: Any) -> set[str]:
+    """Report no schema errors instead of validating the schema."""
+    return set()
+
+
+_real_session_scope = patch_recorder.real_session_scope
+
+
+class _MarkedSessionScope:
+    """Mark the thread as having an active session while in scope."""
+
+    __slots__ = ("_had_session", "_scope")
+
+    def __init__(self, scope: AbstractContextManager["Session"]) -> None:
+        """Initialize the marked session scope."""
+        self._scope = scope
+        self._had_session = False
+
+    def __enter__(self) -> "Session":
+        """Mark the thread and enter the session scope."""
+        self._had_session = thread_session.has_session
+        thread_session.has_session = True
+        try:
+            return self._scope.__enter__()
+        except BaseException:
+            thread_session.has_session = self._had_session
+            raise
+
+    def __exit__(self, *exc_info: object) -> bool | None:
+        """Exit the session scope and restore the mark of the thread."""
+        try:
+            return self._scope.__exit__(*exc_info)
+        finally:
+            thread_session.has_session = self._had_session
+
+
+class RecorderSessions:
+    """Count the recorder sessions of a test and check they are not nested.
+
+    Every session marks its thread as having an active session while open.
+    Every check_interval-th session fails if its thread already has one, so
+    with a higher interval a nested session is only caught when it is sampled.
+    """
+
+    def __init__(self, check_interval: int = 1) -> None:
+        """Initialize the recorder sessions."""
+        self.check_interval = max(check_interval, 1)
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def session_scope(
+        self,
+        *,
+        hass: HomeAssistant | None = None,
+        session: "Session | None" = None,
+        exception_filter: Callable[[Exception], bool] | None = None,
+        read_only: bool = False,
+    ) -> AbstractContextManager["Session"]:
+        """Wrap session_scope to bark if we create nested sessions."""
+        with self._lock:
+            self.opened += 1
+            opened = self.opened
+        if thread_session.has_session and not opened % self.check_interval:
+            raise RuntimeError(
+                f"Thread '{threading.current_thread().name}' already has an "
+                "active session"
+            )
+        return _MarkedSessionScope(
+            _real_session_scope(
+                hass=hass,
+                session=session,
+                exception_filter=exception_filter,
+                read_only=read_only,
+            )
+        )
+
+
+@pytest.fixture
+def recorder_session_check_interval() -> int:
+    """Fixture to control how often recorder sessions are checked for nesting.
+
+    Every session marks its thread as having an active session while open, and
+    every recorder_session_check_interval-th session fails if its thread
+    already has one. Nested sessions which are not sampled go unnoticed.
+    """
+    return 1
+
+
+@pytest.fixture
+def recorder_sessions(recorder_session_check_interval: int) -> RecorderSessions:
+    """Fixture to count the recorder sessions opened by a test."""
+    return RecorderSessions(recorder_session_check_interval)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the recorder database options."""
+    parser.addoption(
+        "--recorder-db-dir",
+        action="store",
+        default=None,
+        help="Directory for on disk SQLite recorder databases, such as a tmpfs",
+    )
+
+
+@pytest.fixture
+def recorder_db_url(
+    recorder_db_url: str, pytestconfig: pytest.Config, persistent_database: bool
+) -> Generator[str]:
+    """Return a connection URL of the recorder test database.
+
+    Extends the fixture of the generated plugins, on disk SQLite databases are
+    created in the directory of the --recorder-db-dir option if given.
+    """
+    db_dir = pytestconfig.getoption("recorder_db_dir")
+    if not (
+        db_dir
+        and persistent_database
+        and pytestconfig.getoption("dburl") == "sqlite://"
+    ):
+        yield recorder_db_url
+        return
+    tmp_path = pathlib.Path(tempfile.mkdtemp(prefix="recorder", dir=db_dir))
+    try:
+        yield "sqlite:///" + str(tmp_path / "pytest.db")
+    finally:
+        rmtree(tmp_path, ignore_errors=True)
+
+
+def _is_recorder_temp_db(
+    db_url: str, pytestconfig: pytest.Config, tmp_path_factory: pytest.TempPathFactory
+) -> bool:
+    """Return if db_url is an on disk SQLite database created by recorder_db_url."""
+    if not db_url.startswith("sqlite:///"):
+        return False
+    db_dir = pathlib.Path(db_url.removeprefix("sqlite:///")).parent
+    temp_dirs = [tmp_path_factory.getbasetemp()]
+    if recorder_db_dir := pytestconfig.getoption("recorder_db_dir"):
+        temp_dirs.append(pathlib.Path(recorder_db_dir))
+    return db_dir.name.startswith("recorder") and db_dir.parent in temp_dirs
+
+
+@pytest.fixture
+def recorder_sqlite_tuning() -> bool:
+    """Fixture to control if temporary SQLite databases are tuned for tests.
+
+    Only the on disk databases created by recorder_db_url are tuned, never a
+    database passed with --dburl. Commits are not synced to disk, temporary
+    tables are kept in memory and the page cache is larger, as the databases
+    are thrown away after the test. The --recorder-db-dir option places the
+    databases on a tmpfs, for example.
+
+    To use the settings of the recorder, tests can be marked with:
+    @pytest.mark.parametrize("recorder_sqlite_tuning", [False])
+    """
+    return True
+
+
+@pytest.fixture
+def recorder_db_template() -> bool:
+    """Fixture to control if SQLite databases are cloned from a template.
+
+    The tables of the current schema are created once per test session and
+    copied into each new SQLite database instead of being created by the
+    recorder. The recorder still initializes the database as a new database.
+
+    To let the recorder create the tables, tests can be marked with:
+    @pytest.mark.parametrize("recorder_db_template", [False])
+    """
+    return True
+
+
+@pytest.fixture
+async def async_test_recorder(
+    recorder_db_url: str,
+    enable_nightly_purge: bool,
+    enable_statistics: bool,
+    enable_missing_statistics: bool,
+    enable_schema_validation: bool,
+    enable_migrate_event_context_ids: bool,
+    enable_migrate_state_context_ids: bool,
+    enable_migrate_event_type_ids: bool,
+    enable_migrate_entity_ids: bool,
+    enable_migrate_event_ids: bool,
+    recorder_db_template: bool,
+    recorder_sqlite_tuning: bool,
+    recorder_sessions: RecorderSessions,
+    pytestconfig: pytest.Config,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> AsyncGenerator[RecorderInstanceContextManager]:
+    """Yield context manager to setup recorder instance.
+
+    Overrides the fixture of the generated plugins. New SQLite databases are
+    cloned from a template unless recorder_db_template is False, temporary on
+    disk ones are tuned unless recorder_sqlite_tuning is False.
+    """
+    from homeassistant.components import recorder
+    from homeassistant.components.recorder import migration
+
+    from .components.recorder.common import (
+        CREATE_ENGINE_TARGET,
+        async_recorder_block_till_done,
+    )
+    from .recorder_db import (
+        SETUP_CONNECTION_TARGET,
+        create_engine_with_db_template,
+        setup_connection_with_sqlite_tuning,
+    )
+
+    nightly = (
+        recorder.Recorder.async_nightly_tasks
+        if enable_nightly_purge
+        else _recorder_task_disabled
+    )
+    stats = (
+        recorder.Recorder.async_periodic_statistics
+        if enable_statistics
+        else _recorder_task_disabled
+    )
+    schema_validate = (
+        migration._find_schema_errors
+        if enable_schema_validation
+        else _recorder_schema_validation_disabled
+    )
+    compile_missing = (
+        recorder.Recorder._schedule_compile_missing_statistics
+        if enable_missing_statistics
+        else _recorder_task_disabled
+    )
+    migrate_states_context_ids = (
+        migration.StatesContextIDMigration.migrate_data
+        if enable_migrate_state_context_ids
+        else _recorder_migration_disabled
+    )
+    migrate_events_context_ids = (
+        migration.EventsContextIDMigration.migrate_data
+        if enable_migrate_event_context_ids
+        else _recorder_migration_disabled
+    )
+    migrate_event_type_ids = (
+        migration.EventTypeIDMigration.migrate_data
+        if enable_migrate_event_type_ids
+        else _recorder_migration_disabled
+    )
+    migrate_entity_ids = (
+        migration.EntityIDMigration.migrate_data
+        if enable_migrate_entity_ids
+        else _recorder_migration_disabled
+    )
+    post_migrate_event_ids = (
+        migration.EventIDPostMigration.needs_migrate_impl
+        if enable_migrate_event_ids
+        else lambda _1, _2, _3: migration.DataMigrationStatus(
+            needs_migrate=False, migration_done=True
+        )
+    )
+    db_template = (
+        patch(CREATE_ENGINE_TARGET, new=create_engine_with_db_template)
+        if recorder_db_template and recorder_db_url.startswith("sqlite://")
+        else nullcontext()
+    )
+    sqlite_tuning = (
+        patch(SETUP_CONNECTION_TARGET, new=setup_connection_with_sqlite_tuning)
+        if recorder_sqlite_tuning
+        and _is_recorder_temp_db(recorder_db_url, pytestconfig, tmp_path_factory)
+        else nullcontext()
+    )
+    with (
+        patch(
+            "homeassistant.components.recorder.Recorder.async_nightly_tasks",
+            new=nightly,
+        ),
+        patch(
+            "homeassistant.components.recorder.Recorder.async_periodic_statistics",
+            new=stats,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration._find_schema_errors",
+            new=schema_validate,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration.EventsContextIDMigration.migrate_data",
+            new=migrate_events_context_ids,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration.StatesContextIDMigration.migrate_data",
+            new=migrate_states_context_ids,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration.EventTypeIDMigration.migrate_data",
+            new=migrate_event_type_ids,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration.EntityIDMigration.migrate_data",
+            new=migrate_entity_ids,
+        ),
+        patch(
+            "homeassistant.components.recorder.migration.EventIDPostMigration.needs_migrate_impl",
+            new=post_migrate_event_ids,
+        ),
+        patch(
+            "homeassistant.components.recorder.Recorder._schedule_compile_missing_statistics",
+            new=compile_missing,
+        ),
+        patch.object(
+            patch_recorder, "real_session_scope", new=recorder_sessions.session_scope
+        ),
+        db_template,
+        sqlite_tuning,
+    ):
+
+        @asynccontextmanager
+        async def async_test_recorder(
+            hass: HomeAssistant,
+            config: ConfigType | None = None,
+            *,
+            expected_setup_result: bool = True,
+            wait_recorder: bool = True,
+            wait_recorder_setup: bool = True,
+        ) -> AsyncGenerator[recorder.Recorder]:
+            """Setup and return recorder instance."""
+            await _async_init_recorder_component(
+                hass,
+                config,
+                recorder_db_url,
+                expected_setup_result=expected_setup_result,
+                wait_setup=wait_recorder_setup,
+            )
+            await hass.async_block_till_done()
+            instance = hass.data[recorder.DATA_INSTANCE]
+            # The recorder's worker is not started until Home Assistant is running
+            if hass.state is CoreState.running and wait_recorder:
+                await async_recorder_block_till_done(hass)
+            try:
+                yield instance
+            finally:
+                if instance.is_alive():
+                    await instance._async_shutdown(None)
+
+        yield async_test_recorder
+
+
+@pytest.fixture
+def recorder_commit_tracker(
+    recorder_mock: "recorder.Recorder", hass: HomeAssistant
+) -> Generator["RecorderCommitTracker"]:
+    """Fixture to wait for the recorder to commit specific events.
+
+    Await recorder_commit_tracker.async_wait(state.context) after writing a
+    state instead of async_wait_recording_done.
+    """
+    from .recorder_history import track_recorder_commits
+
+    with track_recorder_commits(hass) as tracker:
+        yield tracker
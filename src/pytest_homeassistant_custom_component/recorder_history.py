@@ -0,0 +1,880 @@
+"""
+Recorder history helpers for tests working with a lot of history.
+
+The helpers of components/recorder/common.py record states one at a time
+through the state machine. bulk_record_history writes months of synthetic
+history of many entities directly to the recorder database instead, and
+record_states_batched waits for the recorder once per point in time instead
+of once per state. The batch converters convert many rows to native objects,
+decoding each distinct JSON blob once.
+
+async_benchmark_statistics writes synthetic statistics with
+bulk_record_statistics and times statistics_during_period on them.
+"""
+
+import asyncio
+import itertools
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from statistics import median
+from typing import Any, Literal, NamedTuple
+from unittest.mock import patch, sentinel
+
+import numpy as np
+from freezegun import api as freezegun_api
+from freezegun import freeze_time
+from homeassistant.components import recorder
+from homeassistant.components.recorder.db_schema import (
+    EventData,
+    Events,
+    StateAttributes,
+    States,
+    StatesMeta,
+    Statistics,
+    StatisticsMeta,
+    StatisticsShortTerm,
+)
+from homeassistant.components.recorder.models import (
+    StatisticMeanType,
+    bytes_to_ulid_or_none,
+    bytes_to_uuid_hex_or_none,
+)
+from homeassistant.components.recorder.queries import get_shared_attributes
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import DEGREE, UnitOfTemperature
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import (
+    Context,
+    Event,
+    EventOrigin,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.recorder import session_scope
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+from homeassistant.util.read_only_dict import ReadOnlyDict
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm.session import Session
+
+from .components.recorder.common import (
+    EVENT_ORIGIN_ORDER,
+    async_wait_recording_done,
+    get_start_time,
+    statistics_during_period,
+    wait_recording_done,
+)
+
+
+class SyntheticHistory(NamedTuple):
+    """Rows written by bulk_record_history."""
+
+    states: int
+    statistics: int
+
+
+def generate_timestamps(
+    start: datetime, end: datetime, interval: timedelta
+) -> np.ndarray:
+    """Return the timestamps from start until end, every interval."""
+    return np.arange(start.timestamp(), end.timestamp(), interval.total_seconds())
+
+
+def _sine_history_values(entity_id: str, timestamps: np.ndarray) -> np.ndarray:
+    """Return a daily sine wave, shifted by a few hours depending on the entity."""
+    phase = sum(entity_id.encode()) % 24 / 24
+    return np.round(20 + 5 * np.sin(2 * np.pi * (timestamps / 86400 + phase)), 2)
+
+
+def _hourly_statistics(
+    timestamps: np.ndarray, values: np.ndarray, end_ts: float
+) -> Iterator[tuple[float, float, float, float]]:
+    """Return the start, mean, min and max of each hour which ended before end_ts."""
+    if not len(timestamps):
+        return iter(())
+    hours = timestamps - timestamps % 3600
+    starts = np.flatnonzero(np.diff(hours, prepend=-1))
+    ended = hours[starts] + 3600 <= end_ts
+    means = np.add.reduceat(values, starts) / np.diff(starts, append=len(values))
+    return zip(
+        hours[starts][ended].tolist(),
+        means[ended].tolist(),
+        np.minimum.reduceat(values, starts)[ended].tolist(),
+        np.maximum.reduceat(values, starts)[ended].tolist(),
+        strict=True,
+    )
+
+
+def _add_statistics_meta(
+    session: Session, statistic_ids: list[str], unit: str | None
+) -> dict[str, int]:
+    """Return the metadata ids of statistics, adding missing mean statistics."""
+    metadata_ids: dict[str, int] = dict(
+        session.query(StatisticsMeta.statistic_id, StatisticsMeta.id)
+        .filter(StatisticsMeta.statistic_id.in_(statistic_ids))
+        .all()
+    )
+    new_statistics_meta = [
+        StatisticsMeta(
+            statistic_id=statistic_id,
+            source=recorder.DOMAIN,
+            unit_of_measurement=unit,
+            has_mean=True,
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+        )
+        for statistic_id in statistic_ids
+        if statistic_id not in metadata_ids
+    ]
+    session.add_all(new_statistics_meta)
+    session.flush()
+    for statistics_meta in new_statistics_meta:
+        metadata_ids[statistics_meta.statistic_id] = statistics_meta.id
+    return metadata_ids
+
+
+def _link_old_states(
+    session: Session, metadata_id: int, after_state_id: int, batch_size: int
+) -> None:
+    """Link the states written after after_state_id to their previous state.
+
+    The database assigns increasing state ids, so the states are linked in the
+    order they were written.
+    """
+    state_ids = (
+        session.execute(
+            select(States.state_id)
+            .where(States.metadata_id == metadata_id)
+            .where(States.state_id > after_state_id)
+            .order_by(States.state_id)
+        )
+        .scalars()
+        .all()
+    )
+    links = (
+        {"b_state_id": state_id, "b_old_state_id": old_state_id}
+        for old_state_id, state_id in itertools.pairwise(state_ids)
+    )
+    statement = (
+        update(States.__table__)
+        .where(States.__table__.c.state_id == bindparam("b_state_id"))
+        .values(old_state_id=bindparam("b_old_state_id"))
+    )
+    for batch in itertools.batched(links, batch_size):
+        session.execute(statement, list(batch))
+
+
+def bulk_record_history(
+    hass: HomeAssistant,
+    entity_ids: Iterable[str],
+    start: datetime,
+    end: datetime,
+    interval: timedelta = timedelta(minutes=5),
+    *,
+    attributes: dict[str, Any] | None = None,
+    values: Callable[[str, np.ndarray], Sequence[Any]] = _sine_history_values,
+    record_statistics: bool = False,
+    batch_size: int = 10000,
+) -> SyntheticHistory:
+    """Write synthetic history of entities directly to the recorder database.
+
+    Each entity reports a state every interval from start until end. The states
+    are returned by values, which is called once per entity with an array of
+    all timestamps and defaults to a daily sine wave. Like the recorder, a row
+    is only written when the state changes, repeated reports of the same state
+    set last_reported_ts of its row. When record_statistics is set, hourly long
+    term statistics of all reports are written as well, which requires numeric
+    values. All states share one StateAttributes row, an existing row with the
+    same attributes is reused.
+
+    Rows are inserted in batches of batch_size, bypassing the state machine and
+    the recorder queue, so the recorder should be idle. The database assigns
+    the state ids, the states are linked to their previous state afterwards.
+    Use async_bulk_record_history from the event loop.
+    """
+    instance = recorder.get_instance(hass)
+    entity_ids = list(entity_ids)
+    timestamps = generate_timestamps(start, end, interval)
+    timestamp_list = timestamps.tolist()
+    end_ts = end.timestamp()
+    shared_attrs = json_bytes(attributes or {}).decode()
+    attributes_hash = StateAttributes.hash_shared_attrs_bytes(shared_attrs.encode())
+    unit = (attributes or {}).get("unit_of_measurement")
+    states_table = States.__table__
+    statistics_table = Statistics.__table__
+    state_count = statistics_count = 0
+
+    with session_scope(hass=hass) as session:
+        metadata_ids = instance.states_meta_manager.get_many(entity_ids, session, False)
+        statistic_ids = (
+            _add_statistics_meta(session, entity_ids, unit) if record_statistics else {}
+        )
+        new_states_meta = {
+            entity_id: StatesMeta(entity_id=entity_id)
+            for entity_id, metadata_id in metadata_ids.items()
+            if metadata_id is None
+        }
+        attributes_id = next(
+            (
+                existing_id
+                for existing_id, existing_attrs in session.execute(
+                    get_shared_attributes([attributes_hash])
+                )
+                if existing_attrs == shared_attrs
+            ),
+            None,
+        )
+        state_attributes = None
+        if attributes_id is None:
+            state_attributes = StateAttributes(
+                hash=attributes_hash, shared_attrs=shared_attrs
+            )
+            session.add(state_attributes)
+        session.add_all(new_states_meta.values())
+        session.flush()
+        if state_attributes is not None:
+            attributes_id = state_attributes.attributes_id
+        for entity_id, states_meta in new_states_meta.items():
+            metadata_ids[entity_id] = states_meta.metadata_id
+        last_state_id = session.query(func.max(States.state_id)).scalar() or 0
+
+        for entity_id in entity_ids:
+            metadata_id = metadata_ids[entity_id]
+            entity_values = np.asarray(values(entity_id, timestamps))
+            entity_states = [str(value) for value in entity_values.tolist()]
+            # Index of the first and the last report of each written state
+            firsts = [
+                index
+                for index, state in enumerate(entity_states)
+                if not index or state != entity_states[index - 1]
+            ]
+            lasts = [index - 1 for index in firsts[1:]] + [len(entity_states) - 1]
+            state_rows = (
+                {
+                    "metadata_id": metadata_id,
+                    "state": entity_states[first],
+                    "attributes_id": attributes_id,
+                    "last_updated_ts": timestamp_list[first],
+                    "last_reported_ts": timestamp_list[last] if last != first else None,
+                    "origin_idx": 0,
+                }
+                for first, last in zip(firsts, lasts, strict=True)
+            )
+            for batch in itertools.batched(state_rows, batch_size):
+                session.execute(insert(states_table), list(batch))
+            state_count += len(firsts)
+            _link_old_states(session, metadata_id, last_state_id, batch_size)
+            if not record_statistics:
+                continue
+            statistics_rows = [
+                {
+                    "created_ts": end_ts,
+                    "metadata_id": statistic_ids[entity_id],
+                    "start_ts": hour_ts,
+                    "mean": mean,
+                    "min": min_value,
+                    "max": max_value,
+                }
+                for hour_ts, mean, min_value, max_value in _hourly_statistics(
+                    timestamps, entity_values.astype(float), end_ts
+                )
+            ]
+            if statistics_rows:
+                session.execute(insert(statistics_table), statistics_rows)
+                statistics_count += len(statistics_rows)
+
+    return SyntheticHistory(state_count, statistics_count)
+
+
+async def async_bulk_record_history(
+    hass: HomeAssistant, *args: Any, **kwargs: Any
+) -> SyntheticHistory:
+    """Wait for the recorder to be idle and write synthetic history.
+
+    Takes the same arguments as bulk_record_history.
+    """
+    await async_wait_recording_done(hass)
+    return await recorder.get_instance(hass).async_add_executor_job(
+        partial(bulk_record_history, hass, *args, **kwargs)
+    )
+
+
+class SyntheticStatistics(NamedTuple):
+    """Rows written by bulk_record_statistics."""
+
+    statistics: int
+    short_term_statistics: int
+
+
+def bulk_record_statistics(
+    hass: HomeAssistant,
+    statistic_ids: Iterable[str],
+    start: datetime,
+    end: datetime,
+    *,
+    short_term_start: datetime | None = None,
+    unit: str | None = UnitOfTemperature.CELSIUS,
+    values: Callable[[str, np.ndarray], Sequence[Any]] = _sine_history_values,
+    batch_size: int = 10000,
+) -> SyntheticStatistics:
+    """Write synthetic statistics directly to the recorder database.
+
+    The statistics are mean statistics of values sampled every 5 minutes, which
+    defaults to a daily sine wave. Hourly statistics are written from start until
+    end and 5 minute statistics from short_term_start until end, if given. No
+    states are written, use bulk_record_history for those.
+    """
+    statistic_ids = list(statistic_ids)
+    timestamps = generate_timestamps(start, end, timedelta(minutes=5))
+    end_ts = end.timestamp()
+    short_term = np.zeros(len(timestamps), bool)
+    if short_term_start is not None:
+        short_term = (timestamps >= short_term_start.timestamp()) & (
+            timestamps + 300 <= end_ts
+        )
+    statistics_table = Statistics.__table__
+    short_term_table = StatisticsShortTerm.__table__
+    statistics_count = short_term_count = 0
+
+    def insert_rows(table: Any, rows: list[dict[str, Any]]) -> None:
+        for offset in range(0, len(rows), batch_size):
+            session.execute(insert(table), rows[offset : offset + batch_size])
+
+    with session_scope(hass=hass) as session:
+        metadata_ids = _add_statistics_meta(session, statistic_ids, unit)
+        for statistic_id in statistic_ids:
+            metadata_id = metadata_ids[statistic_id]
+            statistic_values = np.asarray(values(statistic_id, timestamps), float)
+            statistics_rows = [
+                {
+                    "created_ts": end_ts,
+                    "metadata_id": metadata_id,
+                    "start_ts": hour_ts,
+                    "mean": mean,
+                    "min": min_value,
+                    "max": max_value,
+                }
+                for hour_ts, mean, min_value, max_value in _hourly_statistics(
+                    timestamps, statistic_values, end_ts
+                )
+            ]
+            insert_rows(statistics_table, statistics_rows)
+            statistics_count += len(statistics_rows)
+            short_term_rows = [
+                {
+                    "created_ts": end_ts,
+                    "metadata_id": metadata_id,
+                    "start_ts": ts,
+                    "mean": value,
+                    "min": value,
+                    "max": value,
+                }
+                for ts, value in zip(
+                    timestamps[short_term].tolist(),
+                    statistic_values[short_term].tolist(),
+                    strict=True,
+                )
+            ]
+            insert_rows(short_term_table, short_term_rows)
+            short_term_count += len(short_term_rows)
+
+    return SyntheticStatistics(statistics_count, short_term_count)
+
+
+async def async_bulk_record_statistics(
+    hass: HomeAssistant, *args: Any, **kwargs: Any
+) -> SyntheticStatistics:
+    """Wait for the recorder to be idle and write synthetic statistics.
+
+    Takes the same arguments as bulk_record_statistics.
+    """
+    await async_wait_recording_done(hass)
+    return await recorder.get_instance(hass).async_add_executor_job(
+        partial(bulk_record_statistics, hass, *args, **kwargs)
+    )
+
+
+STATISTICS_BENCHMARK_PERIODS: tuple[
+    Literal["5minute", "day", "hour", "week", "month", "year"], ...
+] = ("5minute", "hour", "day", "week", "month")
+STATISTICS_BENCHMARK_UNITS: tuple[dict[str, str] | None, ...] = (
+    None,
+    {"temperature": UnitOfTemperature.FAHRENHEIT},
+)
+
+
+def benchmark_statistics_during_period(
+    hass: HomeAssistant,
+    start: datetime,
+    end: datetime,
+    statistic_ids: Sequence[str],
+    *,
+    periods: Iterable[
+        Literal["5minute", "day", "hour", "week", "month", "year"]
+    ] = STATISTICS_BENCHMARK_PERIODS,
+    units: Iterable[dict[str, str] | None] = STATISTICS_BENCHMARK_UNITS,
+    statistic_id_counts: Iterable[int] | None = None,
+    repeat: int = 5,
+) -> list[dict[str, Any]]:
+    """Time statistics_during_period from start until end.
+
+    Each combination of period, units and number of statistic ids is queried
+    repeat times, using the first statistic ids. The number of statistic ids
+    defaults to 1, 10 and all of them. Returns a result per combination with the
+    rows returned and the min, median and max query time in milliseconds.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    if statistic_id_counts is None:
+        statistic_id_counts = sorted(
+            {1, min(10, len(statistic_ids)), len(statistic_ids)}
+        )
+    results: list[dict[str, Any]] = []
+    for period, period_units, count in itertools.product(
+        periods, units, statistic_id_counts
+    ):
+        query_statistic_ids = set(statistic_ids[:count])
+        times_ms: list[float] = []
+        for _ in range(repeat):
+            query_start = freezegun_api.real_perf_counter()
+            stats = statistics_during_period(
+                hass, start, end, query_statistic_ids, period, period_units
+            )
+            times_ms.append((freezegun_api.real_perf_counter() - query_start) * 1000)
+        results.append(
+            {
+                "period": period,
+                "units": period_units,
+                "statistic_ids": count,
+                "rows": sum(len(rows) for rows in stats.values()),
+                "min_ms": round(min(times_ms), 3),
+                "median_ms": round(median(times_ms), 3),
+                "max_ms": round(max(times_ms), 3),
+            }
+        )
+    return results
+
+
+async def async_benchmark_statistics(
+    hass: HomeAssistant,
+    report_path: str | Path | None = None,
+    *,
+    statistic_ids: int = 100,
+    days: int = 30,
+    short_term_days: int = 10,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Write synthetic statistics and benchmark querying them.
+
+    Writes hourly statistics for days and 5 minute statistics for the last
+    short_term_days of statistic_ids statistics, and benchmarks querying them
+    with benchmark_statistics_during_period, which takes the other keyword
+    arguments. Returns a report of the Home Assistant version, the database,
+    the statistics written and the results, which is also written as JSON to
+    report_path if given.
+    """
+    instance = recorder.get_instance(hass)
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    ids = [f"sensor.benchmark_{index}" for index in range(statistic_ids)]
+    written = await async_bulk_record_statistics(
+        hass, ids, start, end, short_term_start=end - timedelta(days=short_term_days)
+    )
+    results = await instance.async_add_executor_job(
+        partial(benchmark_statistics_during_period, hass, start, end, ids, **kwargs)
+    )
+    report = {
+        "home_assistant_version": HA_VERSION,
+        "database": {
+            "dialect": instance.dialect_name,
+            "version": str(instance.database_engine.version)
+            if instance.database_engine and instance.database_engine.version
+            else None,
+        },
+        "statistic_ids": statistic_ids,
+        "days": days,
+        "short_term_days": short_term_days,
+        **written._asdict(),
+        "results": results,
+    }
+    if report_path is not None:
+        Path(report_path).write_bytes(json_bytes(report))
+    return report
+
+
+class RecorderCommitTracker:
+    """Track which events the recorder has committed to the database.
+
+    Events are identified by their context id. Waiting for an event does not
+    queue anything, the waiter is resolved by the recorder's own commit, so
+    many writes can be made before waiting for all of them at once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.commits = 0
+        self.committed_events = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self._committed: set[str] = set()
+        self._futures: dict[str, asyncio.Future[None]] = {}
+        self._processed: list[str] = []
+
+    def _process_one_event(
+        self, process_one_event: Callable[[Event], None], event: Event
+    ) -> None:
+        """Process an event in the recorder thread and remember its context."""
+        # Added first as the event is committed while processing it when the
+        # commit interval is 0
+        self._processed.append(event.context.id)
+        process_one_event(event)
+
+    def _commit_event_session_or_retry(self, commit: Callable[[], None]) -> None:
+        """Commit in the recorder thread and report the committed contexts."""
+        commit()
+        if self._processed:
+            processed, self._processed = self._processed, []
+            self.hass.loop.call_soon_threadsafe(self._async_committed, processed)
+
+    @callback
+    def _async_committed(self, context_ids: list[str]) -> None:
+        """Resolve the futures of committed contexts."""
+        self.commits += 1
+        self.committed_events += len(context_ids)
+        self._committed.update(context_ids)
+        for context_id in context_ids:
+            future = self._futures.pop(context_id, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    @callback
+    def async_committed(self, context: Context | str) -> asyncio.Future[None]:
+        """Return a future resolved once an event of a context is committed."""
+        context_id = context if isinstance(context, str) else context.id
+        if (future := self._futures.get(context_id)) is None:
+            future = self.hass.loop.create_future()
+            if context_id in self._committed:
+                future.set_result(None)
+            else:
+                self._futures[context_id] = future
+        return future
+
+    async def async_wait(self, *contexts: Context | str) -> None:
+        """Wait until events of all contexts are committed."""
+        # freezegun does not patch attributes of its own module
+        start = freezegun_api.real_perf_counter()
+        await asyncio.gather(*(self.async_committed(context) for context in contexts))
+        self.waits += 1
+        self.wait_time += freezegun_api.real_perf_counter() - start
+
+
+@contextmanager
+def track_recorder_commits(hass: HomeAssistant) -> Iterator[RecorderCommitTracker]:
+    """Track the events committed by the recorder.
+
+    Only events processed by the recorder after the tracking started can be
+    waited for.
+    """
+    instance = recorder.get_instance(hass)
+    tracker = RecorderCommitTracker(hass)
+    with (
+        patch.object(
+            instance,
+            "_process_one_event",
+            partial(tracker._process_one_event, instance._process_one_event),
+        ),
+        patch.object(
+            instance,
+            "_commit_event_session_or_retry",
+            partial(
+                tracker._commit_event_session_or_retry,
+                instance._commit_event_session_or_retry,
+            ),
+        ),
+    ):
+        yield tracker
+
+
+def _record_states_steps() -> tuple[
+    datetime, datetime, list[tuple[datetime, list[tuple[str, str, dict[str, Any]]]]]
+]:
+    """Return the time range and the states to set at each step of record_states.
+
+    The states are the ones of record_states of components/recorder/common.py.
+    """
+    mp = "media_player.test"
+    sns1 = "sensor.test1"
+    sns2 = "sensor.test2"
+    sns3 = "sensor.test3"
+    sns4 = "sensor.test4"
+    sns5 = "sensor.wind_direction"
+    sns1_attr = {
+        "device_class": "temperature",
+        "state_class": "measurement",
+        "unit_of_measurement": UnitOfTemperature.CELSIUS,
+    }
+    sns2_attr = {
+        "device_class": "humidity",
+        "state_class": "measurement",
+        "unit_of_measurement": "%",
+    }
+    sns3_attr = {"device_class": "temperature"}
+    sns4_attr = {}
+    sns5_attr = {
+        "device_class": SensorDeviceClass.WIND_DIRECTION,
+        "state_class": SensorStateClass.MEASUREMENT_ANGLE,
+        "unit_of_measurement": DEGREE,
+    }
+
+    zero = get_start_time(dt_util.utcnow())
+    one = zero + timedelta(seconds=1 * 5)
+    two = one + timedelta(seconds=15 * 5)
+    three = two + timedelta(seconds=30 * 5)
+    four = three + timedelta(seconds=14 * 5)
+
+    steps = [
+        (
+            one,
+            [
+                (mp, "idle", {"media_title": str(sentinel.mt1)}),
+                (sns1, "10", sns1_attr),
+                (sns2, "10", sns2_attr),
+                (sns3, "10", sns3_attr),
+                (sns4, "10", sns4_attr),
+                (sns5, "10", sns5_attr),
+            ],
+        ),
+        (
+            one + timedelta(microseconds=1),
+            [(mp, "YouTube", {"media_title": str(sentinel.mt2)})],
+        ),
+        (
+            two,
+            [
+                (sns1, "15", sns1_attr),
+                (sns2, "15", sns2_attr),
+                (sns3, "15", sns3_attr),
+                (sns4, "15", sns4_attr),
+                (sns5, "350", sns5_attr),
+            ],
+        ),
+        (
+            three,
+            [
+                (sns1, "20", sns1_attr),
+                (sns2, "20", sns2_attr),
+                (sns3, "20", sns3_attr),
+                (sns4, "20", sns4_attr),
+                (sns5, "5", sns5_attr),
+            ],
+        ),
+    ]
+    return zero, four, steps
+
+
+async def async_record_states_batched(
+    hass: HomeAssistant,
+) -> tuple[datetime, datetime, dict[str, list[State | None]]]:
+    """Record the test states of record_states, waiting once per step.
+
+    The states are set from the event loop and the recorder is waited for once
+    per point in time instead of once per state. Returns the same time range
+    and states as async_record_states of components/recorder/common.py.
+    """
+    zero, four, steps = _record_states_steps()
+    states: dict[str, list[State | None]] = {
+        entity_id: [] for _, step_states in steps for entity_id, _, _ in step_states
+    }
+    with freeze_time(steps[0][0]) as freezer:
+        for step_time, step_states in steps:
+            freezer.move_to(step_time)
+            for entity_id, state, attributes in step_states:
+                hass.states.async_set(entity_id, state, attributes)
+                states[entity_id].append(hass.states.get(entity_id))
+            await async_wait_recording_done(hass)
+
+    return zero, four, states
+
+
+def record_states_batched(
+    hass: HomeAssistant,
+) -> tuple[datetime, datetime, dict[str, list[State | None]]]:
+    """Record the test states of record_states, waiting once per step.
+
+    Like record_states of components/recorder/common.py, which waits for the
+    recorder after every state, the recorder is waited for once per point in
+    time instead.
+    """
+    zero, four, steps = _record_states_steps()
+    states: dict[str, list[State | None]] = {
+        entity_id: [] for _, step_states in steps for entity_id, _, _ in step_states
+    }
+    with freeze_time(steps[0][0]) as freezer:
+        for step_time, step_states in steps:
+            freezer.move_to(step_time)
+            for entity_id, state, attributes in step_states:
+                hass.states.set(entity_id, state, attributes=attributes)
+                states[entity_id].append(hass.states.get(entity_id))
+            wait_recording_done(hass)
+
+    return zero, four, states
+
+
+BATCH_TO_NATIVE_CHUNK_SIZE = 1000
+
+_EMPTY_JSON_OBJECT: ReadOnlyDict[str, Any] = ReadOnlyDict()
+
+
+def _decode_json_objects(
+    blobs: Iterable[str | None], cache: dict[str, ReadOnlyDict[str, Any]]
+) -> None:
+    """Add the JSON objects missing from cache, decoding them in one call."""
+    if missing := list(
+        dict.fromkeys(blob for blob in blobs if blob and blob not in cache)
+    ):
+        for blob, value in zip(
+            missing, json_loads(f"[{','.join(missing)}]"), strict=True
+        ):
+            if type(value) is not dict:
+                raise ValueError(f"Expected JSON to be parsed as a dict got {value}")
+            cache[blob] = ReadOnlyDict(value)
+
+
+def _batch_to_native[RowT, NativeT](
+    rows: Iterable[RowT],
+    get_blob: Callable[[RowT], str | None],
+    to_native: Callable[[RowT, ReadOnlyDict[str, Any]], NativeT],
+    chunk_size: int,
+) -> Iterator[NativeT]:
+    """Convert rows chunk by chunk, decoding each distinct JSON blob once."""
+    cache: dict[str, ReadOnlyDict[str, Any]] = {}
+    for chunk in itertools.batched(rows, chunk_size):
+        blobs = [get_blob(row) for row in chunk]
+        _decode_json_objects(blobs, cache)
+        for row, blob in zip(chunk, blobs, strict=True):
+            yield to_native(row, cache[blob] if blob else _EMPTY_JSON_OBJECT)
+
+
+def db_state_batch_to_native(
+    states: Iterable[States],
+    shared_attrs: Mapping[int, str | None] | None = None,
+    validate_entity_id: bool = True,
+    chunk_size: int = BATCH_TO_NATIVE_CHUNK_SIZE,
+) -> Iterator[State | None]:
+    """Convert states to HA state objects, like db_state_to_native.
+
+    The states are converted lazily. Attributes are read from the attributes
+    column, or looked up by attributes_id in shared_attrs when given. Equal
+    attributes are decoded once and shared between the states.
+    """
+
+    def get_blob(state: States) -> str | None:
+        if state.attributes or shared_attrs is None or state.attributes_id is None:
+            return state.attributes
+        return shared_attrs.get(state.attributes_id)
+
+    def to_native(state: States, attrs: ReadOnlyDict[str, Any]) -> State:
+        last_updated_ts = state.last_updated_ts or 0
+        last_updated = dt_util.utc_from_timestamp(last_updated_ts)
+        last_changed = last_reported = last_updated
+        if state.last_changed_ts not in (None, last_updated_ts):
+            last_changed = dt_util.utc_from_timestamp(state.last_changed_ts or 0)
+        if state.last_reported_ts not in (None, last_updated_ts):
+            last_reported = dt_util.utc_from_timestamp(state.last_reported_ts or 0)
+        return State(
+            state.entity_id or "",
+            state.state,  # type: ignore[arg-type]
+            attrs,
+            last_changed=last_changed,
+            last_reported=last_reported,
+            last_updated=last_updated,
+            context=Context(
+                id=bytes_to_ulid_or_none(state.context_id_bin),
+                user_id=bytes_to_uuid_hex_or_none(state.context_user_id_bin),
+                parent_id=bytes_to_ulid_or_none(state.context_parent_id_bin),
+            ),
+            validate_entity_id=validate_entity_id,
+        )
+
+    return _batch_to_native(states, get_blob, to_native, chunk_size)
+
+
+def db_event_batch_to_native(
+    events: Iterable[Events],
+    shared_data: Mapping[int, str | None] | None = None,
+    validate_entity_id: bool = True,
+    chunk_size: int = BATCH_TO_NATIVE_CHUNK_SIZE,
+) -> Iterator[Event | None]:
+    """Convert events to HA event objects, like db_event_to_native.
+
+    The events are converted lazily. Event data is read from the event_data
+    column, or looked up by data_id in shared_data when given. Equal event data
+    is decoded once and shared between the events: unlike db_event_to_native,
+    which gives every event a fresh dict, event.data is a shared ReadOnlyDict
+    and must be copied before it is modified. validate_entity_id is accepted
+    for parity with db_event_to_native, events have no entity id to validate.
+    """
+
+    def get_blob(event: Events) -> str | None:
+        if event.event_data or shared_data is None or event.data_id is None:
+            return event.event_data
+        return shared_data.get(event.data_id)
+
+    def to_native(event: Events, data: ReadOnlyDict[str, Any]) -> Event:
+        return Event(
+            event.event_type or "",
+            data,
+            EventOrigin(event.origin)
+            if event.origin
+            else EVENT_ORIGIN_ORDER[event.origin_idx or 0],
+            event.time_fired_ts or 0,
+            context=Context(
+                id=bytes_to_ulid_or_none(event.context_id_bin),
+                user_id=bytes_to_uuid_hex_or_none(event.context_user_id_bin),
+                parent_id=bytes_to_ulid_or_none(event.context_parent_id_bin),
+            ),
+        )
+
+    return _batch_to_native(events, get_blob, to_native, chunk_size)
+
+
+def db_state_attributes_batch_to_native(
+    state_attrs: Iterable[StateAttributes],
+    chunk_size: int = BATCH_TO_NATIVE_CHUNK_SIZE,
+) -> Iterator[ReadOnlyDict[str, Any]]:
+    """Convert state attributes lazily, like db_state_attributes_to_native.
+
+    Equal attributes are decoded once and the same read only dict is returned,
+    while db_state_attributes_to_native returns a fresh dict per row. Copy the
+    result before modifying it.
+    """
+    return _batch_to_native(
+        state_attrs,
+        lambda row: row.shared_attrs,
+        lambda row, attrs: attrs,
+        chunk_size,
+    )
+
+
+def db_event_data_batch_to_native(
+    event_data: Iterable[EventData],
+    chunk_size: int = BATCH_TO_NATIVE_CHUNK_SIZE,
+) -> Iterator[ReadOnlyDict[str, Any]]:
+    """Convert event data lazily, like db_event_data_to_native.
+
+    Equal event data is decoded once and the same read only dict is returned,
+    while db_event_data_to_native returns a fresh dict per row. Copy the result
+    before modifying it.
+    """
+    return _batch_to_native(
+        event_data,
+        lambda row: row.shared_data,
+        lambda row, data: data,
+        chunk_size,
+    )
@@ -0,0 +1,153 @@
+"""
+Restore state cache helpers for tests restoring many entities.
+
+mock_restore_cache and mock_restore_cache_with_extra_data of common.py
+serialize every state on its own. The helpers here build the cache entries of
+many states at once and can share them between tests.
+
+async_benchmark_restore_state_restarts measures the shutdown and restart
+cycles of the restore state of many entities.
+"""
+
+import time
+from collections.abc import Generator, Iterable, Mapping
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import restore_state as rs
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .common import async_mock_load_restore_state_from_storage
+
+
+def build_restore_cache(
+    states: Iterable[State | tuple[State, Mapping[str, Any] | None]],
+    last_seen: datetime | None = None,
+) -> dict[str, rs.StoredState]:
+    """Build restore cache entries for mock_restore_cache_bulk.
+
+    Unlike mock_restore_cache, the attributes of all states are round-tripped
+    through JSON in a single batch and the restored states are created without
+    serializing them to dicts first. States can be given with extra data and
+    as a generator.
+
+    The result does not depend on hass, build it once in a session scoped
+    fixture to share it between tests.
+    """
+    if last_seen is None:
+        last_seen = dt_util.utcnow()
+    entries = [(item, None) if isinstance(item, State) else item for item in states]
+    attributes = json_loads(json_bytes([state.attributes for state, _ in entries]))
+
+    last_states: dict[str, rs.StoredState] = {}
+    for (state, extra_data), state_attributes in zip(entries, attributes, strict=True):
+        last_states[state.entity_id] = rs.StoredState(
+            State(
+                state.entity_id,
+                state.state,
+                state_attributes,
+                last_changed=state.last_changed,
+                last_reported=state.last_reported,
+                last_updated=state.last_updated,
+                context=state.context,
+                validate_entity_id=False,
+            ),
+            rs.RestoredExtraData(dict(extra_data)) if extra_data else None,
+            last_seen,
+        )
+    assert len(last_states) == len(entries), "Duplicate entity_id?"
+    return last_states
+
+
+def mock_restore_cache_bulk(
+    hass: HomeAssistant,
+    states: Mapping[str, rs.StoredState]
+    | Iterable[State | tuple[State, Mapping[str, Any] | None]],
+) -> rs.RestoreStateData:
+    """Mock the DATA_RESTORE_CACHE with many states.
+
+    states is either an iterable of states, optionally with extra data, or
+    entries built by build_restore_cache. Prebuilt entries are copied, so
+    entities restored or removed in one test do not leak into the entries
+    shared with other tests.
+    """
+    data = rs.RestoreStateData(hass)
+    if isinstance(states, Mapping):
+        data.last_states = dict(states)
+    else:
+        data.last_states = build_restore_cache(states)
+
+    rs.async_get.cache_clear()
+    hass.data[rs.DATA_RESTORE_STATE] = data
+    return data
+
+
+def generate_restore_states(
+    count: int,
+    attributes: Mapping[str, Any] | None = None,
+    domain: str = "sensor",
+) -> Generator[State]:
+    """Generate states to populate the restore cache."""
+    for idx in range(count):
+        yield State(f"{domain}.restore_state_{idx}", str(idx), attributes)
+
+
+class RestoreStateCycleStats(NamedTuple):
+    """Measurements of a restore state shutdown and restart cycle."""
+
+    entities: int
+    dump_time: float
+    load_time: float
+    stored_bytes: int
+    largest_entity_id: str | None
+    largest_entity_bytes: int
+
+    @property
+    def bytes_per_entity(self) -> float:
+        """Return the average number of stored bytes per entity."""
+        return self.stored_bytes / self.entities if self.entities else 0
+
+
+async def async_benchmark_restore_state_restarts(
+    hass: HomeAssistant, hass_storage: dict[str, Any], cycles: int = 1
+) -> list[RestoreStateCycleStats]:
+    """Run restore state shutdown and restart cycles and measure each of them.
+
+    Each cycle dumps the restore states to hass_storage and loads them again,
+    like async_mock_restore_state_shutdown_restart. Sizes are measured on the
+    stored data serialized as JSON, the largest entity helps to spot entities
+    with large extra restore state data.
+    """
+    data = rs.async_get(hass)
+    results: list[RestoreStateCycleStats] = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        await data.async_dump_states()
+        dump_time = time.perf_counter() - start
+
+        stored = hass_storage[rs.STORAGE_KEY]
+        entity_bytes = {
+            item["state"]["entity_id"]: len(json_bytes(item)) for item in stored["data"]
+        }
+        largest_entity_id, largest_entity_bytes = max(
+            entity_bytes.items(), key=lambda item: item[1], default=(None, 0)
+        )
+
+        start = time.perf_counter()
+        await async_mock_load_restore_state_from_storage(hass)
+        load_time = time.perf_counter() - start
+
+        results.append(
+            RestoreStateCycleStats(
+                len(entity_bytes),
+                dump_time,
+                load_time,
+                len(json_bytes(stored)),
+                largest_entity_id,
+                largest_entity_bytes,
+            )
+        )
+    return results
@@ -0,0 +1,79 @@
+"""
+File backed cache for warm state shared between test processes.
+
+The pytest-xdist controller creates the cache directory and passes it to
+every worker, so immutable data such as parsed translation files is only
+loaded once per test run instead of once per worker.
+"""
+
+import hashlib
+import os
+import pathlib
+from collections import Counter
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+SHARED_CACHE_WORKERINPUT = "phacc_shared_cache_dir"
+SHARED_CACHE_WORKEROUTPUT = "phacc_shared_cache_stats"
+
+
+class SharedCache:
+    """Key value cache of JSON serializable values stored in a directory.
+
+    Each entry is written to its own file and atomically moved in place, so
+    concurrent workers never read partial entries and no locking is needed.
+    Two workers may compute the same entry at the same time; the last one to
+    finish wins, which is fine as entries are immutable.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """Initialize the shared cache."""
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, namespace: str, key: str) -> pathlib.Path:
+        """Return the file storing an entry."""
+        digest = hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+        return self.path / namespace / f"{digest}.json"
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        """Return a cached value or None if it was not cached yet."""
+        try:
+            data = self._entry_path(namespace, key).read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json_loads(data)
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a value for other workers."""
+        entry_path = self._entry_path(namespace, key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(json_bytes(value))
+        os.replace(tmp_path, entry_path)
+
+
+class XdistSharedCachePlugin:
+    """Pass the shared cache directory from the xdist controller to its workers.
+
+    Cache statistics reported by the workers are summed up in worker_stats.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """Initialize the plugin."""
+        self.path = path
+        self.worker_stats: Counter[str] = Counter()
+
+    def pytest_configure_node(self, node: Any) -> None:
+        """Add the shared cache directory to the worker input."""
+        node.workerinput[SHARED_CACHE_WORKERINPUT] = str(self.path)
+
+    def pytest_testnodedown(self, node: Any, error: Any) -> None:
+        """Collect the cache statistics of a finished worker."""
+        workeroutput = getattr(node, "workeroutput", {})
+        self.worker_stats.update(workeroutput.get(SHARED_CACHE_WORKEROUTPUT, {}))
@@ -0,0 +1,120 @@
+"""
+Batched platform snapshots.
+
+snapshot_platform of common.py stores the registry entry and the state of
+each entity of a platform in snapshots of their own, so a platform with many
+entities makes as many snapshot assertions. The snapshot_platform here can
+store all of them in a single snapshot instead.
+"""
+
+import difflib
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from syrupy.assertion import SnapshotAssertion
+
+from . import common
+
+
+def _split_platform_snapshot(serialized: str) -> dict[str, str]:
+    """Split a serialized platform snapshot in the text of each entity."""
+    entities: dict[str, str] = {}
+    key: str | None = None
+    lines: list[str] = []
+    for line in serialized.splitlines():
+        # Entities are the only lines indented once and starting with a key
+        if line.startswith("  '"):
+            if key is not None:
+                entities[key] = "\n".join(lines)
+            key = line[3 : line.index("'", 3)]
+            lines = []
+        if key is not None:
+            lines.append(line)
+    if key is not None:
+        entities[key] = "\n".join(lines[:-1])
+    return entities
+
+
+def _assert_platform_snapshot(
+    snapshot: SnapshotAssertion, name: str, platform: dict[str, dict[str, Any]]
+) -> None:
+    """Assert a platform matches a single snapshot, only diffing mismatches.
+
+    The received and stored data are read from the result syrupy records for
+    the assertion. If they are not available, the assertion is repeated to fail
+    with syrupy's own diff instead.
+    """
+    assertion = snapshot(name=name)
+    if assertion == platform:
+        return
+    try:
+        result = assertion.executions[assertion.num_executions - 1]
+        exception = result.exception
+        asserted_data = result.asserted_data
+        recalled_data = result.recalled_data
+    except (AttributeError, KeyError):
+        assert snapshot(name=name) == platform
+        return
+    if exception is not None:
+        raise exception
+    if recalled_data is None:
+        pytest.fail(f"Snapshot '{name}' does not exist!", pytrace=False)
+    received = _split_platform_snapshot(str(asserted_data or ""))
+    stored = _split_platform_snapshot(str(recalled_data))
+    mismatches = sorted(
+        entity_id
+        for entity_id in received.keys() | stored.keys()
+        if received.get(entity_id) != stored.get(entity_id)
+    )
+    diff = [
+        f"Snapshot '{name}' mismatch for {len(mismatches)} of {len(received)} entities"
+    ]
+    for entity_id in mismatches:
+        diff.extend(
+            difflib.unified_diff(
+                stored.get(entity_id, "").splitlines(),
+                received.get(entity_id, "").splitlines(),
+                f"snapshot {entity_id}",
+                f"received {entity_id}",
+                lineterm="",
+            )
+        )
+    pytest.fail("\n".join(diff), pytrace=False)
+
+
+async def snapshot_platform(
+    hass: HomeAssistant,
+    entity_registry: er.EntityRegistry,
+    snapshot: SnapshotAssertion,
+    config_entry_id: str,
+    batched: bool = False,
+    snapshot_name: str | None = None,
+) -> None:
+    """Snapshot a platform.
+
+    When batched, the entries and states of all entities are stored in a
+    single snapshot, which is serialized and compared at once. On a mismatch,
+    only the entities that differ are diffed. The snapshot is named after the
+    platform, e.g. sensor-platform. Pass snapshot_name when the same platform
+    is snapshotted more than once in a test. Otherwise the snapshots are the
+    ones of snapshot_platform in common.py.
+    """
+    if not batched:
+        await common.snapshot_platform(hass, entity_registry, snapshot, config_entry_id)
+        return
+    entity_entries = er.async_entries_for_config_entry(entity_registry, config_entry_id)
+    assert entity_entries
+    assert len({entity_entry.domain for entity_entry in entity_entries}) == 1, (
+        "Please limit the loaded platforms to 1 platform."
+    )
+    platform: dict[str, dict[str, Any]] = {}
+    for entity_entry in entity_entries:
+        assert entity_entry.disabled_by is None, "Please enable all entities."
+        state = hass.states.get(entity_entry.entity_id)
+        assert state, f"State not found for {entity_entry.entity_id}"
+        platform[entity_entry.entity_id] = {"entry": entity_entry, "state": state}
+    _assert_platform_snapshot(
+        snapshot, snapshot_name or f"{entity_entries[0].domain}-platform", platform
+    )
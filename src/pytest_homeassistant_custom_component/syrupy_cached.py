@@ -0,0 +1,188 @@
+"""
+Snapshot serializer looking up its preprocessors once per type.
+
+HomeAssistantSnapshotSerializer runs a chain of isinstance checks for every
+node of the serialized data. The serializer here caches the preprocessor of
+each type instead, which gives the same snapshots in less time for large
+data. The snapshot fixture is overridden to use it.
+"""
+
+import dataclasses
+from contextlib import suppress
+from enum import IntFlag
+from typing import Any
+from unittest.mock import NonCallableMock
+
+import attr
+import attrs
+import pytest
+import voluptuous as vol
+import voluptuous_serialize
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import State
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import issue_registry as ir
+from syrupy.assertion import SnapshotAssertion
+from syrupy.extensions.amber import AmberDataSerializer
+from syrupy.types import PropertyFilter, PropertyMatcher, PropertyPath, SerializableData
+
+from .syrupy import (
+    HomeAssistantSnapshotExtension,
+    HomeAssistantSnapshotSerializer,
+    _IntFlagWrapper,
+)
+
+_CONVERSATION_RESULT_KEYS = {"conversation_id", "response", "continue_conversation"}
+
+# Preprocessors by type, see _type_preprocessor
+_TYPE_PREPROCESSORS: dict[type, str | None] = {}
+_TYPE_PREPROCESSORS_MAX_SIZE = 4096
+
+
+def _dict_preprocessor(data: dict) -> str | None:
+    """Return the name of the preprocessor for a dict depending on its keys."""
+    if "flow_id" in data and "handler" in data:
+        return "_serializable_flow_result"
+    if len(data) == 3 and data.keys() == _CONVERSATION_RESULT_KEYS:
+        return "_serializable_conversation_result"
+    return None
+
+
+def _type_preprocessor(data_type: type) -> str | None:
+    """Return the name of the preprocessor for a type.
+
+    The preprocessor only depends on the type, so it is looked up once per type
+    and cached. Names are returned instead of methods so serializer subclasses
+    can override the preprocessors. Mocks are not cached as every mock instance
+    has its own class, and the cache is emptied once it holds
+    _TYPE_PREPROCESSORS_MAX_SIZE types, so types created on the fly can't make
+    it grow without bounds.
+    """
+    try:
+        return _TYPE_PREPROCESSORS[data_type]
+    except KeyError:
+        pass
+    preprocessor: str | None = None
+    if issubclass(data_type, State):
+        preprocessor = "_serializable_state"
+    elif issubclass(data_type, ar.AreaEntry):
+        preprocessor = "_serializable_area_registry_entry"
+    elif issubclass(data_type, dr.DeviceEntry):
+        preprocessor = "_serializable_device_registry_entry"
+    elif issubclass(data_type, er.RegistryEntry):
+        preprocessor = "_serializable_entity_registry_entry"
+    elif issubclass(data_type, ir.IssueEntry):
+        preprocessor = "_serializable_issue_registry_entry"
+    elif issubclass(data_type, vol.Schema):
+        preprocessor = "_serializable_schema"
+    elif issubclass(data_type, ConfigEntry):
+        preprocessor = "_serializable_config_entry"
+    elif dataclasses.is_dataclass(data_type):
+        preprocessor = "_serializable_dataclass"
+    elif issubclass(data_type, IntFlag):
+        preprocessor = "_serializable_int_flag"
+    else:
+        with suppress(TypeError):
+            if attr.has(data_type):
+                preprocessor = "_serializable_attrs"
+    if not issubclass(data_type, NonCallableMock):
+        if len(_TYPE_PREPROCESSORS) >= _TYPE_PREPROCESSORS_MAX_SIZE:
+            _TYPE_PREPROCESSORS.clear()
+        _TYPE_PREPROCESSORS[data_type] = preprocessor
+    return preprocessor
+
+
+class CachedHomeAssistantSnapshotSerializer(HomeAssistantSnapshotSerializer):
+    """Home Assistant snapshot serializer with a per type preprocessor cache.
+
+    Objects whose __class__ differs from their type, such as mocks with a
+    spec, are preprocessed by the isinstance checks of the parent serializer,
+    as isinstance looks at __class__.
+    """
+
+    @classmethod
+    def _serialize(
+        cls,
+        data: SerializableData,
+        *,
+        depth: int = 0,
+        exclude: PropertyFilter | None = None,
+        include: PropertyFilter | None = None,
+        matcher: PropertyMatcher | None = None,
+        path: PropertyPath = (),
+        visited: set[Any] | None = None,
+    ) -> str:
+        """Pre-process data with the preprocessor cached for its type."""
+        data_type = type(data)
+        if data_type is not data.__class__:
+            return super()._serialize(
+                data,
+                depth=depth,
+                exclude=exclude,
+                include=include,
+                matcher=matcher,
+                path=path,
+                visited=visited,
+            )
+        serializable_data = data
+        if isinstance(data, dict) and (dict_preprocessor := _dict_preprocessor(data)):
+            serializable_data = getattr(cls, dict_preprocessor)(data)
+        elif preprocessor := _type_preprocessor(data_type):
+            serializable_data = getattr(cls, preprocessor)(data)
+
+        # Skip the isinstance checks of the parent serializer
+        return super(HomeAssistantSnapshotSerializer, cls)._serialize(
+            serializable_data,
+            depth=depth,
+            exclude=exclude,
+            include=include,
+            matcher=matcher,
+            path=path,
+            visited=visited,
+        )
+
+    @classmethod
+    def _serializable_attrs(cls, data: Any) -> SerializableData:
+        """Prepare an attrs instance for serialization."""
+        return attrs.asdict(data)
+
+    @classmethod
+    def _serializable_dataclass(cls, data: Any) -> SerializableData:
+        """Prepare a dataclass instance for serialization."""
+        return dataclasses.asdict(data)
+
+    @classmethod
+    def _serializable_int_flag(cls, data: IntFlag) -> SerializableData:
+        """Prepare an IntFlag for serialization.
+
+        The repr of an enum.IntFlag has changed between Python 3.10 and 3.11
+        so we normalize it here.
+        """
+        return _IntFlagWrapper(data)
+
+    @classmethod
+    def _serializable_schema(cls, data: vol.Schema) -> SerializableData:
+        """Prepare a voluptuous schema for serialization."""
+        return voluptuous_serialize.convert(data)
+
+
+class CachedHomeAssistantSnapshotExtension(HomeAssistantSnapshotExtension):
+    """Home Assistant extension for Syrupy with the cached serializer.
+
+    The snapshots are the same as the ones of HomeAssistantSnapshotExtension,
+    so the serializer version is kept.
+    """
+
+    serializer_class: type[AmberDataSerializer] = CachedHomeAssistantSnapshotSerializer
+
+
+@pytest.fixture
+def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
+    """Return snapshot assertion fixture with the cached Home Assistant extension.
+
+    Overrides the fixture of the generated plugins, which uses
+    HomeAssistantSnapshotExtension.
+    """
+    return snapshot.use_extension(CachedHomeAssistantSnapshotExtension)
@@ -0,0 +1,213 @@
+"""
+Compact snapshot storage for Syrupy.
+
+Amber snapshot files are text files which are parsed completely each time one
+of their snapshots is read, and Syrupy reads every snapshot file of a
+snapshots directory to discover unused snapshots. The extension here stores
+each snapshot compressed on its own behind an index of offsets, so reading a
+snapshot only decompresses that snapshot and discovering snapshots only reads
+the index.
+
+Existing amber files can be converted with convert_amber_snapshots, and the
+compact_snapshot fixture uses the extension.
+"""
+
+import os
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+from syrupy.assertion import SnapshotAssertion
+from syrupy.data import Snapshot, SnapshotCollection
+from syrupy.exceptions import TaintedSnapshotError
+from syrupy.types import SerializedData
+
+from .syrupy_cached import CachedHomeAssistantSnapshotExtension
+
+COMPACT_FILE_EXTENSION = "hasnap"
+COMPACT_FILE_FORMAT = 1
+COMPACT_FILE_MAGIC = b"HASNAP"
+
+type _SnapshotIndex = dict[str, list[int]]
+
+
+def _read_header(path: str) -> tuple[str, _SnapshotIndex, int] | None:
+    """Return the serializer version, index and data offset of a snapshot file.
+
+    Files in an unknown format get an empty version, so they are regenerated.
+    """
+    try:
+        with open(path, "rb") as snapshot_file:
+            header = snapshot_file.readline()
+            index = snapshot_file.readline()
+            data_offset = snapshot_file.tell()
+    except FileNotFoundError:
+        return None
+    magic, _, rest = header.rstrip(b"\n").partition(b" ")
+    file_format, _, version = rest.partition(b" ")
+    if magic != COMPACT_FILE_MAGIC or file_format != b"%d" % COMPACT_FILE_FORMAT:
+        return "", {}, data_offset
+    return version.decode(), json_loads(index), data_offset
+
+
+@lru_cache
+def _read_header_cached(
+    path: str, session_id: str
+) -> tuple[str, _SnapshotIndex, int] | None:
+    """Return the header of a snapshot file, read once per session."""
+    return _read_header(path)
+
+
+def _read_compressed_snapshots(path: str) -> tuple[str, dict[str, bytes]]:
+    """Return the serializer version and compressed snapshots of a file."""
+    if (header := _read_header(path)) is None:
+        return "", {}
+    version, index, data_offset = header
+    with open(path, "rb") as snapshot_file:
+        snapshot_file.seek(data_offset)
+        data = snapshot_file.read()
+    return version, {
+        name: data[offset : offset + length] for name, (offset, length) in index.items()
+    }
+
+
+def _write_compressed_snapshots(
+    path: str,
+    version: str,
+    snapshots: dict[str, bytes],
+    name_order: dict[str, int] | None = None,
+) -> None:
+    """Write compressed snapshots to a file, replacing it atomically.
+
+    Snapshots are stored by name, or in the order of name_order when given.
+    The headers cached for the session are dropped, as they may be stale.
+    """
+    index: _SnapshotIndex = {}
+    offset = 0
+    if name_order:
+        names = sorted(snapshots, key=lambda name: (name_order.get(name, -1), name))
+    else:
+        names = sorted(snapshots)
+    for name in names:
+        index[name] = [offset, len(snapshots[name])]
+        offset += len(snapshots[name])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(
+            b"%s %d %s\n" % (COMPACT_FILE_MAGIC, COMPACT_FILE_FORMAT, version.encode())
+        )
+        snapshot_file.write(json_bytes(index) + b"\n")
+        for name in names:
+            snapshot_file.write(snapshots[name])
+    os.replace(tmp_path, path)
+    _read_header_cached.cache_clear()
+
+
+class HomeAssistantCompactSnapshotExtension(CachedHomeAssistantSnapshotExtension):
+    """Home Assistant extension for Syrupy storing snapshots in compact files.
+
+    Snapshots are serialized like with HomeAssistantSnapshotExtension, only
+    the storage differs.
+    """
+
+    file_extension = COMPACT_FILE_EXTENSION
+
+    def read_snapshot_collection(self, snapshot_location: str) -> SnapshotCollection:
+        """Return the snapshot names of a file, without their data."""
+        snapshot_collection = SnapshotCollection(location=snapshot_location)
+        if (header := _read_header(snapshot_location)) is not None:
+            version, index, _ = header
+            snapshot_collection.tainted = version != self.serializer_class.VERSION
+            for name in index:
+                snapshot_collection.add(Snapshot(name=name))
+        return snapshot_collection
+
+    def read_snapshot_data_from_location(
+        self, snapshot_location: str, snapshot_name: str, session_id: str
+    ) -> SerializedData | None:
+        """Return the data of a single snapshot."""
+        if (header := _read_header_cached(snapshot_location, session_id)) is None:
+            return None
+        version, index, data_offset = header
+        data = None
+        if (entry := index.get(snapshot_name)) is not None:
+            offset, length = entry
+            with open(snapshot_location, "rb") as snapshot_file:
+                snapshot_file.seek(data_offset + offset)
+                data = zlib.decompress(snapshot_file.read(length)).decode()
+        if version != self.serializer_class.VERSION:
+            raise TaintedSnapshotError(snapshot_data=data)
+        return data
+
+    @classmethod
+    def write_snapshot_collection(
+        cls,
+        *,
+        snapshot_collection: SnapshotCollection,
+        name_order: dict[str, int] | None = None,
+    ) -> None:
+        """Add the snapshots of a collection to its file."""
+        _, snapshots = _read_compressed_snapshots(snapshot_collection.location)
+        for snapshot in snapshot_collection:
+            if snapshot.data is not None:
+                snapshots[snapshot.name] = zlib.compress(str(snapshot.data).encode())
+        _write_compressed_snapshots(
+            snapshot_collection.location,
+            cls.serializer_class.VERSION,
+            snapshots,
+            name_order,
+        )
+
+    def delete_snapshots(
+        self, snapshot_location: str, snapshot_names: set[str]
+    ) -> None:
+        """Remove snapshots from a file, removing the file once empty."""
+        version, snapshots = _read_compressed_snapshots(snapshot_location)
+        for name in snapshot_names:
+            snapshots.pop(name, None)
+        if snapshots:
+            _write_compressed_snapshots(snapshot_location, version, snapshots)
+        else:
+            Path(snapshot_location).unlink()
+            _read_header_cached.cache_clear()
+
+
+def convert_amber_snapshots(path: Path | str, remove: bool = False) -> list[Path]:
+    """Convert amber snapshot files to compact snapshot files.
+
+    path is either an amber file or a directory searched recursively for amber
+    files. Each compact file is written next to its amber file, which is
+    removed when remove is set. Returns the compact files written.
+    """
+    path = Path(path)
+    amber_files = [path] if path.is_file() else sorted(path.rglob("*.ambr"))
+    serializer_class = HomeAssistantCompactSnapshotExtension.serializer_class
+    compact_files: list[Path] = []
+    for amber_file in amber_files:
+        snapshot_collection = serializer_class.read_file(str(amber_file))
+        compact_file = amber_file.with_suffix(f".{COMPACT_FILE_EXTENSION}")
+        _write_compressed_snapshots(
+            str(compact_file),
+            "" if snapshot_collection.tainted else serializer_class.VERSION,
+            {
+                snapshot.name: zlib.compress(str(snapshot.data).encode())
+                for snapshot in snapshot_collection
+                if snapshot.data is not None
+            },
+        )
+        if remove:
+            amber_file.unlink()
+        compact_files.append(compact_file)
+    return compact_files
+
+
+@pytest.fixture
+def compact_snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
+    """Return snapshot assertion fixture storing snapshots in compact files.
+
+    Override the snapshot fixture with it to use compact files for all tests.
+    """
+    return snapshot.use_extension(HomeAssistantCompactSnapshotExtension)
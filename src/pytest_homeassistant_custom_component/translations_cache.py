@@ -0,0 +1,435 @@
+"""
+Caches for parsed translation files.
+
+Parsing translation files is a large part of the set up cost of integrations
+in tests. The caches here are layered in front of Home Assistant's
+_load_translations_files_by_language so each file is parsed as rarely as
+possible, either once per test run when shared between pytest-xdist workers,
+or once per Home Assistant version when persisted on disk.
+
+Parsed integration manifests and loaded fixture files are not shared. Only
+translation files are, as they are the part of the set up cost which grows
+with the number of integrations a test loads.
+"""
+
+import os
+import pathlib
+import tempfile
+import zlib
+from collections.abc import (
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextlib import contextmanager
+from shutil import rmtree
+from typing import Any, Protocol
+from unittest.mock import _patch, patch
+
+import pytest
+from homeassistant import components, loader
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import DOMAIN as HA_DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import translation as translation_helper
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.translation import _TranslationsCacheData
+from homeassistant.util.json import json_loads
+
+from .shared_cache import (
+    SHARED_CACHE_WORKERINPUT,
+    SHARED_CACHE_WORKEROUTPUT,
+    SharedCache,
+    XdistSharedCachePlugin,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+CACHE_FORMAT = 1
+
+type LoadTranslationsFiles = Callable[
+    [dict[str, dict[str, pathlib.Path]]], dict[str, dict[str, Any]]
+]
+
+
+class TranslationFilesCache(Protocol):
+    """Cache of parsed translation files."""
+
+    def get(self, translation_file: pathlib.Path) -> dict[str, Any] | None:
+        """Return the parsed translation file or None if not cached."""
+
+    def set(self, translation_file: pathlib.Path, translations: dict[str, Any]) -> None:
+        """Store a parsed translation file."""
+
+
+def _file_signature(translation_file: pathlib.Path) -> list[int] | None:
+    """Return the modification time and size of a file or None if missing."""
+    try:
+        stat = translation_file.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class SharedTranslationsCache:
+    """Parsed translation files stored in the cache shared by xdist workers.
+
+    Like the persistent cache, each entry holds the modification time and size
+    of the translation file, so a file changed during the run is parsed again.
+    """
+
+    def __init__(self, shared_cache: SharedCache) -> None:
+        """Initialize the shared translations cache."""
+        self._shared_cache = shared_cache
+
+    def get(self, translation_file: pathlib.Path) -> dict[str, Any] | None:
+        """Return the parsed translation file or None if not cached or stale."""
+        entry = self._shared_cache.get("translations", str(translation_file))
+        if entry is None or entry[0] != _file_signature(translation_file):
+            return None
+        return entry[1]
+
+    def set(self, translation_file: pathlib.Path, translations: dict[str, Any]) -> None:
+        """Store a parsed translation file."""
+        self._shared_cache.set(
+            "translations",
+            str(translation_file),
+            [_file_signature(translation_file), translations],
+        )
+
+
+@contextmanager
+def _file_lock(path: pathlib.Path) -> Iterator[None]:
+    """Hold an exclusive lock on a lock file, waiting for other processes.
+
+    Without fcntl, on Windows, nothing is locked and concurrent saves may drop
+    each other's new entries, which are then parsed again in the next run.
+    """
+    if fcntl is None:
+        yield
+        return
+    with path.open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PersistentTranslationsCache:
+    """Parsed translation files persisted between test runs.
+
+    All entries are stored in a single zlib compressed JSON file. Each entry
+    holds the modification time and size of the translation file it was parsed
+    from, together with the still serialized translations which are only
+    decoded when requested. The whole file is discarded when the Home Assistant
+    version changes.
+    """
+
+    def __init__(self, path: pathlib.Path, version: str) -> None:
+        """Initialize the persistent translations cache."""
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._entries: dict[str, list[Any]] | None = None
+        self._new_entries: dict[str, list[Any]] = {}
+
+    def _read(self) -> dict[str, list[Any]]:
+        """Read the entries stored on disk for the current version."""
+        try:
+            data = json_loads(zlib.decompress(self.path.read_bytes()))
+        except (OSError, ValueError, zlib.error):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != CACHE_FORMAT
+            or data.get("version") != self.version
+        ):
+            return {}
+        return data["files"]
+
+    def get(self, translation_file: pathlib.Path) -> dict[str, Any] | None:
+        """Return the parsed translation file or None if not cached or stale."""
+        if self._entries is None:
+            self._entries = self._read()
+        if (entry := self._entries.get(str(translation_file))) is None:
+            self.misses += 1
+            return None
+        if entry[0] != _file_signature(translation_file):
+            self.invalidated += 1
+            return None
+        self.hits += 1
+        return json_loads(entry[1])
+
+    def set(self, translation_file: pathlib.Path, translations: dict[str, Any]) -> None:
+        """Store a parsed translation file."""
+        entry = [
+            _file_signature(translation_file),
+            json_bytes(translations).decode(),
+        ]
+        if self._entries is not None:
+            self._entries[str(translation_file)] = entry
+        self._new_entries[str(translation_file)] = entry
+
+    def save(self) -> None:
+        """Write new entries to disk.
+
+        Entries written by other processes since the cache was loaded are kept.
+        The read, merge and replace is done holding a lock file, so xdist
+        workers saving at the same time don't drop each other's entries.
+        Entries of translation files which were removed or changed since they
+        were parsed are dropped.
+        """
+        if not self._new_entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.path.with_name(f"{self.path.name}.lock")):
+            entries = self._read() | self._new_entries
+            data = {
+                "format": CACHE_FORMAT,
+                "version": self.version,
+                "files": {
+                    translation_file: entry
+                    for translation_file, entry in entries.items()
+                    if entry[0] is not None
+                    and entry[0] == _file_signature(pathlib.Path(translation_file))
+                },
+            }
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(zlib.compress(json_bytes(data)))
+            os.replace(tmp_path, self.path)
+        self._new_entries = {}
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache statistics."""
+        return {
+            "translations_cache_hits": self.hits,
+            "translations_cache_misses": self.misses,
+            "translations_cache_invalidated": self.invalidated,
+        }
+
+
+def translations_cache_summary(stats: Mapping[str, int]) -> str:
+    """Return a human readable summary of translations cache statistics."""
+    hits = stats.get("translations_cache_hits", 0)
+    misses = stats.get("translations_cache_misses", 0)
+    invalidated = stats.get("translations_cache_invalidated", 0)
+    lookups = hits + misses + invalidated
+    hit_rate = hits / lookups if lookups else 0
+    return (
+        f"{hits} hits, {misses} misses, {invalidated} invalidated"
+        f" (hit rate {hit_rate:.1%})"
+    )
+
+
+def cached_load_translations_files(
+    caches: Sequence[TranslationFilesCache],
+    load_translations_files: LoadTranslationsFiles,
+) -> LoadTranslationsFiles:
+    """Wrap _load_translations_files_by_language to look up caches in order.
+
+    A file found in a later cache is added to the earlier caches, files found
+    in no cache are parsed and added to all of them.
+    """
+
+    def _lookup(translation_file: pathlib.Path) -> dict[str, Any] | None:
+        for idx, cache in enumerate(caches):
+            if (translations := cache.get(translation_file)) is not None:
+                for earlier_cache in caches[:idx]:
+                    earlier_cache.set(translation_file, translations)
+                return translations
+        return None
+
+    def _load_translations_files_by_language(
+        translation_files: dict[str, dict[str, pathlib.Path]],
+    ) -> dict[str, dict[str, Any]]:
+        loaded: dict[str, dict[str, Any]] = {}
+        files_to_load: dict[str, dict[str, pathlib.Path]] = {}
+        for language, component_translation_file in translation_files.items():
+            loaded_for_language = loaded.setdefault(language, {})
+            for component, translation_file in component_translation_file.items():
+                if (translations := _lookup(translation_file)) is None:
+                    files_to_load.setdefault(language, {})[component] = translation_file
+                else:
+                    loaded_for_language[component] = translations
+
+        if not files_to_load:
+            return loaded
+
+        for language, translations in load_translations_files(files_to_load).items():
+            for component, translation in translations.items():
+                translation_file = files_to_load[language][component]
+                for cache in caches:
+                    cache.set(translation_file, translation)
+            loaded[language].update(translations)
+        return loaded
+
+    return _load_translations_files_by_language
+
+
+SHARED_CACHE_KEY = pytest.StashKey[SharedCache]()
+TRANSLATIONS_CACHE_KEY = pytest.StashKey[PersistentTranslationsCache]()
+XDIST_SHARED_CACHE_PLUGIN_KEY = pytest.StashKey[XdistSharedCachePlugin]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the translations cache option."""
+    parser.addoption(
+        "--translations-cache",
+        action="store",
+        default=None,
+        help="File to persist parsed translation files in between test runs",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Set up the translations caches of the session."""
+    if workerinput := getattr(config, "workerinput", None):
+        # pytest-xdist worker, use the cache directory created by the controller
+        if shared_cache_dir := workerinput.get(SHARED_CACHE_WORKERINPUT):
+            config.stash[SHARED_CACHE_KEY] = SharedCache(pathlib.Path(shared_cache_dir))
+    elif config.pluginmanager.hasplugin("xdist") and config.getoption(
+        "numprocesses", None
+    ):
+        # pytest-xdist controller, create a cache directory for the workers
+        xdist_plugin = XdistSharedCachePlugin(
+            pathlib.Path(tempfile.mkdtemp(prefix="phacc-shared-"))
+        )
+        config.pluginmanager.register(xdist_plugin)
+        config.stash[XDIST_SHARED_CACHE_PLUGIN_KEY] = xdist_plugin
+
+    if translations_cache_file := config.getoption("translations_cache"):
+        config.stash[TRANSLATIONS_CACHE_KEY] = PersistentTranslationsCache(
+            pathlib.Path(translations_cache_file), HA_VERSION
+        )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Persist the translations cache and report its statistics to xdist."""
+    config = session.config
+    if (translations_cache := config.stash.get(TRANSLATIONS_CACHE_KEY, None)) is None:
+        return
+    translations_cache.save()
+    if workeroutput := getattr(config, "workeroutput", None):
+        workeroutput[SHARED_CACHE_WORKEROUTPUT] = translations_cache.stats()
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Remove the shared cache directory."""
+    if xdist_plugin := config.stash.get(XDIST_SHARED_CACHE_PLUGIN_KEY, None):
+        rmtree(xdist_plugin.path, ignore_errors=True)
+
+
+def pytest_terminal_summary(
+    terminalreporter: pytest.TerminalReporter, config: pytest.Config
+) -> None:
+    """Report the translations cache statistics if it is used."""
+    if config.getoption("translations_cache"):
+        if xdist_plugin := config.stash.get(XDIST_SHARED_CACHE_PLUGIN_KEY, None):
+            stats = xdist_plugin.worker_stats
+        else:
+            stats = config.stash[TRANSLATIONS_CACHE_KEY].stats()
+        terminalreporter.section("translations cache")
+        terminalreporter.write_line(translations_cache_summary(stats))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def translations_once(
+    translations_once: _patch, pytestconfig: pytest.Config
+) -> Generator[_patch]:
+    """Only load translations once per session.
+
+    Overrides the fixture of the generated plugins to also cache parsed
+    translation files on disk with --translations-cache and share them between
+    the workers when running with pytest-xdist.
+    """
+    caches: list[TranslationFilesCache] = []
+    if translations_cache := pytestconfig.stash.get(TRANSLATIONS_CACHE_KEY, None):
+        caches.append(translations_cache)
+    if shared_cache := pytestconfig.stash.get(SHARED_CACHE_KEY, None):
+        caches.append(SharedTranslationsCache(shared_cache))
+    if not caches:
+        yield translations_once
+        return
+    with patch(
+        "homeassistant.helpers.translation._load_translations_files_by_language",
+        cached_load_translations_files(
+            caches, translation_helper._load_translations_files_by_language
+        ),
+    ):
+        yield translations_once
+
+
+@pytest.fixture(autouse=True, scope="module")
+def evict_faked_translations(translations_once: _patch) -> Generator[None]:
+    """Clear translations for mocked integrations from the cache after each module.
+
+    Overrides the fixture of the generated plugins, which records every call
+    with a Mock. Only the domains which are not backed by a real component are remembered
+    while the module runs, the arguments of the calls are not kept.
+    """
+    real_component_strings = translation_helper._async_get_component_strings
+    component_paths = frozenset(
+        pathlib.Path(component_path) for component_path in components.__path__
+    )
+    faked_domains: set[str] = set()
+
+    def _async_get_cached_translations(
+        _hass: HomeAssistant,
+        _language: str,
+        _category: str,
+        _integration: str | None = None,
+    ) -> dict[str, str]:
+        # Override default implementation to ensure "homeassistant"
+        # is always considered when getting "global" cached translations
+        cache = translation_helper._async_get_translations_cache(_hass)
+        _components = (
+            {_integration}
+            if _integration
+            else _hass.config.top_level_components | {HA_DOMAIN}
+        )
+        return cache.get_cached(_language, _category, _components)
+
+    async def _async_get_component_strings(
+        _hass: HomeAssistant,
+        _languages: Iterable[str],
+        _components: set[str],
+        integrations: dict[str, loader.Integration],
+    ) -> dict[str, dict[str, Any]]:
+        for domain in _components:
+            # If the integration exists, don't evict from cache
+            if (
+                (integration := integrations.get(domain))
+                and integration.file_path.name == domain
+                and integration.file_path.parent in component_paths
+            ):
+                continue
+            faked_domains.add(domain)
+        return await real_component_strings(
+            _hass, _languages, _components, integrations
+        )
+
+    with (
+        patch(
+            "homeassistant.helpers.translation.async_get_cached_translations",
+            _async_get_cached_translations,
+        ),
+        patch(
+            "homeassistant.helpers.translation._async_get_component_strings",
+            _async_get_component_strings,
+        ),
+    ):
+        yield
+    cache: _TranslationsCacheData = translations_once.kwargs["return_value"]
+
+    for domain in faked_domains:
+        for loaded_for_lang in cache.loaded.values():
+            loaded_for_lang.discard(domain)
@@ -3,9 +3,17 @@
 from syrupy.assertion import SnapshotAssertion
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 
 from pytest_homeassistant_custom_component.common import MockConfigEntry
-from pytest_homeassistant_custom_component.components.diagnostics import get_diagnostics_for_config_entry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+    get_diagnostics_for_device,
+)
+from pytest_homeassistant_custom_component.diagnostics import (
+    get_diagnostics_for_config_entries,
+    get_diagnostics_for_devices,
+)
 from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
 
 from custom_components.simple_integration.const import DOMAIN
@@ -44,3 +52,56 @@ async def test_entry_diagnostics(
     assert await get_diagnostics_for_config_entry(
         hass, hass_client, entry
     ) == snapshot(exclude=limit_diagnostic_attrs)
+
+
+async def test_entries_diagnostics(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+) -> None:
+    """Test diagnostics of several config entries fetched at once."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, data={"name": f"simple config {idx}"})
+        for idx in range(3)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await get_diagnostics_for_config_entries(hass, hass_client, entries)
+
+    assert list(diagnostics) == [entry.entry_id for entry in entries]
+    assert diagnostics[entries[1].entry_id] == await get_diagnostics_for_config_entry(
+        hass, hass_client, entries[1]
+    )
+
+
+async def test_devices_diagnostics(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    device_registry: dr.DeviceRegistry,
+) -> None:
+    """Test diagnostics of several devices fetched at once."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"name": "simple config"})
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    devices = [
+        device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, f"device_{idx}")},
+            name=f"Device {idx}",
+        )
+        for idx in range(3)
+    ]
+
+    diagnostics = await get_diagnostics_for_devices(hass, hass_client, entry, devices)
+
+    assert list(diagnostics) == [device.id for device in devices]
+    assert diagnostics[devices[1].id] == {
+        "name": "Device 1",
+        "identifiers": [[DOMAIN, "device_1"]],
+    }
+    assert diagnostics[devices[2].id] == await get_diagnostics_for_device(
+        hass, hass_client, entry, devices[2]
+    )
@@ -0,0 +1,103 @@
+"""Tests for the fake MQTT client."""
+from datetime import timedelta
+from unittest.mock import call
+
+import pytest
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.fake_mqtt import (
+    FakeMqttClient,
+    MqttBroker,
+    MqttTopicTrie,
+)
+from pytest_homeassistant_custom_component.typing import MqttMockHAClient
+
+
+@pytest.fixture
+def mqtt_client_mock(mqtt_fake_client: FakeMqttClient) -> FakeMqttClient:
+    """Set up MQTT with the fake client."""
+    return mqtt_fake_client
+
+
+@pytest.fixture
+def mqtt_fake_client_record_calls() -> bool:
+    """Record the calls made to the fake client."""
+    return True
+
+
+def test_topic_trie_match() -> None:
+    """Test matching topics against topic filters with wildcards."""
+    trie = MqttTopicTrie()
+    for topic_filter in ("a/b", "a/+", "a/#", "#", "+/b/c", "$SYS/#"):
+        trie.add(topic_filter)
+
+    assert len(trie) == 6
+    assert sorted(trie.match("a/b")) == ["#", "a/#", "a/+", "a/b"]
+    assert sorted(trie.match("a")) == ["#", "a/#"]
+    assert sorted(trie.match("x/b/c")) == ["#", "+/b/c"]
+    assert trie.match("$SYS/broker") == ["$SYS/#"]
+
+    assert trie.remove("a/+")
+    assert not trie.remove("a/+")
+    assert "a/+" not in trie
+    assert "a/b" in trie
+    assert sorted(trie.match("a/b")) == ["#", "a/#", "a/b"]
+
+
+def test_topic_trie_match_filter() -> None:
+    """Test matching a topic filter against added topics."""
+    trie = MqttTopicTrie()
+    for topic in ("a", "a/b", "a/b/c", "x/b", "$SYS/uptime"):
+        trie.add(topic)
+
+    assert sorted(trie.match_filter("a/#")) == ["a", "a/b", "a/b/c"]
+    assert sorted(trie.match_filter("#")) == ["a", "a/b", "a/b/c", "x/b"]
+    assert sorted(trie.match_filter("+/b")) == ["a/b", "x/b"]
+    assert trie.match_filter("$SYS/+") == ["$SYS/uptime"]
+
+
+def test_mqtt_broker_retained_messages() -> None:
+    """Test retained messages are stored, cleared and returned on subscribe."""
+    broker = MqttBroker()
+
+    assert not broker.publish("home/d1/config", b"{}", 0, True)
+    assert not broker.publish("home/d2/config", b"{}", 1, True)
+    assert not broker.publish("home/d1/config", b"", 0, True)
+    assert broker.subscribe("home/+/config") == [
+        ("home/d2/config", b"{}", 1),
+    ]
+    assert broker.publish("home/d3/config", b"{}", 0, False)
+    assert broker.stats() == {
+        "subscriptions": 1,
+        "retained": 1,
+        "delivered": 2,
+        "dropped": 3,
+    }
+
+
+async def test_fake_client_delivers_subscribed_topics(
+    hass: HomeAssistant,
+    mqtt_mock: MqttMockHAClient,
+    mqtt_fake_client: FakeMqttClient,
+) -> None:
+    """Test only messages published to subscribed topics are delivered."""
+    received = []
+
+    @callback
+    def record_message(msg: mqtt.ReceiveMessage) -> None:
+        received.append(msg)
+
+    await mqtt.async_subscribe(hass, "test/+", record_message)
+    # Subscriptions are debounced by the MQTT client
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    await mqtt.async_publish(hass, "test/a", "on")
+    await mqtt.async_publish(hass, "other/a", "on")
+    await hass.async_block_till_done()
+
+    assert [(msg.topic, msg.payload) for msg in received] == [("test/a", "on")]
+    assert mqtt_fake_client.published == 2
+    assert call.publish("test/a", "on", 0, False, None) in mqtt_fake_client.calls
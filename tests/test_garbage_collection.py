@@ -0,0 +1,62 @@
+"""Tests for the garbage_collection module."""
+import gc
+
+import pytest
+
+from pytest_homeassistant_custom_component.garbage_collection import (
+    GC_POLICY_ALLOCATED,
+    GC_POLICY_TESTS,
+    GarbageCollectionStats,
+)
+
+pytest_plugins = ["pytester"]
+
+
+def test_garbage_collection_tests_policy():
+    """Test the tests policy collects every interval tests."""
+    gc_stats = GarbageCollectionStats(GC_POLICY_TESTS, 3, 0)
+    for _ in range(7):
+        gc_stats.before_test()
+    assert gc_stats.collections == 3
+    assert gc_stats.collect_time > 0
+
+
+def test_garbage_collection_allocated_policy():
+    """Test the allocated policy collects once until the threshold is reached."""
+    gc_stats = GarbageCollectionStats(GC_POLICY_ALLOCATED, 1, 10**12)
+    for _ in range(5):
+        gc_stats.before_test()
+    assert gc_stats.collections == 1
+    assert gc_stats.summary()[0] == "policy: allocated"
+
+
+def test_garbage_collection_no_freeze():
+    """Test the survivors are not frozen when freezing is disabled."""
+    gc.unfreeze()
+    gc_stats = GarbageCollectionStats(GC_POLICY_TESTS, 1, 0, freeze=False)
+    gc_stats.before_test()
+    assert gc_stats.collections == 1
+    assert gc.get_freeze_count() == 0
+
+
+def test_garbage_collection_option(pytester: pytest.Pytester):
+    """Test the garbage collection options override the generated fixture."""
+    pytester.makeini(
+        "[pytest]\n"
+        "asyncio_mode = auto\n"
+        "asyncio_default_fixture_loop_scope = function\n"
+    )
+    pytester.makepyfile(
+        """
+        def test_one():
+            pass
+
+        def test_two():
+            pass
+        """
+    )
+    result = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider", "--gc-policy=tests", "--gc-report"
+    )
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["policy: tests", "explicit collections: 2 *"])
@@ -0,0 +1,139 @@
+"""Tests for the MQTT helpers."""
+import pathlib
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.fake_mqtt import (
+    MqttBroker,
+    async_fire_mqtt_messages,
+    async_replay_mqtt_capture,
+    read_mqtt_capture,
+)
+from pytest_homeassistant_custom_component.typing import MqttMockHAClient
+
+
+async def test_async_fire_mqtt_messages(
+    hass: HomeAssistant, mqtt_mock: MqttMockHAClient
+) -> None:
+    """Test firing a stream of MQTT messages."""
+    received = []
+
+    @callback
+    def record_message(msg: mqtt.ReceiveMessage) -> None:
+        received.append(msg)
+
+    await mqtt.async_subscribe(hass, "test/+", record_message)
+    fired = await async_fire_mqtt_messages(
+        hass,
+        ((f"test/{i % 10}", str(i)) for i in range(1000)),
+        block_every=100,
+    )
+    await hass.async_block_till_done()
+
+    assert fired == 1000
+    assert len(received) == 1000
+    assert received[-1].topic == "test/9"
+    assert received[-1].payload == "999"
+
+
+async def test_async_replay_mqtt_capture(
+    hass: HomeAssistant,
+    mqtt_mock: MqttMockHAClient,
+    freezer: FrozenDateTimeFactory,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test replaying a MQTT capture file with a speed multiplier."""
+    capture_file = tmp_path / "capture.jsonl"
+    capture_file.write_text(
+        '{"topic": "test/a", "payload": "on", "timestamp": 100.0}\n'
+        "\n"
+        '{"topic": "test/b", "payload_base64": "AAE=", "qos": 1, "timestamp": 110.0}\n'
+        '{"topic": "test/c", "payload": 0, "timestamp": 110.0}\n'
+        '{"topic": "test/a", "payload": "off", "retain": true, "timestamp": 130.0}\n'
+    )
+    received = []
+
+    @callback
+    def record_message(msg: mqtt.ReceiveMessage) -> None:
+        received.append(msg)
+
+    await mqtt.async_subscribe(hass, "test/+", record_message, encoding=None)
+    start = dt_util.utcnow()
+    replayed = await async_replay_mqtt_capture(
+        hass, read_mqtt_capture(capture_file), freezer, speed=10
+    )
+
+    assert replayed == 4
+    assert dt_util.utcnow() - start == timedelta(seconds=3)
+    assert [(msg.topic, msg.payload, msg.retain) for msg in received] == [
+        ("test/a", b"on", False),
+        ("test/b", b"\x00\x01", False),
+        ("test/c", b"0", False),
+        ("test/a", b"off", True),
+    ]
+    assert [msg.qos for msg in received] == [0, 1, 0, 0]
+
+    # Without a freezer the capture is replayed at once
+    assert await async_replay_mqtt_capture(hass, read_mqtt_capture(capture_file)) == 4
+    assert dt_util.utcnow() - start == timedelta(seconds=3)
+    # The retained message was already delivered to the subscription
+    assert [(msg.topic, msg.payload) for msg in received[4:]] == [
+        (msg.topic, msg.payload) for msg in received[:3]
+    ]
+
+
+def test_read_mqtt_capture(tmp_path: pathlib.Path) -> None:
+    """Test falsy and non string payloads are read from a capture file."""
+    capture_file = tmp_path / "capture.jsonl"
+    capture_file.write_text(
+        '{"topic": "test/a", "payload": 0, "timestamp": 1.0}\n'
+        '{"topic": "test/a", "payload": false, "timestamp": 2.0}\n'
+        '{"topic": "test/a", "payload": "", "timestamp": 3.0}\n'
+        '{"topic": "test/a", "payload": null, "timestamp": 4.0}\n'
+        '{"topic": "test/a", "payload": {"on": true}, "timestamp": 5.0}\n'
+    )
+
+    assert [message.payload for message in read_mqtt_capture(capture_file)] == [
+        b"0",
+        b"false",
+        b"",
+        b"",
+        b'{"on":true}',
+    ]
+
+
+@pytest.fixture
+def mqtt_broker() -> MqttBroker:
+    """Route the MQTT messages of the tests through a new broker."""
+    return MqttBroker()
+
+
+async def test_mqtt_broker(
+    hass: HomeAssistant, mqtt_mock: MqttMockHAClient, mqtt_broker: MqttBroker
+) -> None:
+    """Test the broker keeps retained messages and drops unsubscribed topics."""
+    received = []
+
+    @callback
+    def record_message(msg: mqtt.ReceiveMessage) -> None:
+        received.append(msg)
+
+    await mqtt.async_publish(hass, "test/retained", "on", retain=True)
+    await mqtt.async_publish(hass, "test/not_retained", "on")
+    await hass.async_block_till_done()
+    await mqtt.async_subscribe(hass, "test/#", record_message)
+    # Subscriptions are debounced by the MQTT client
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+
+    assert [(msg.topic, msg.retain) for msg in received] == [("test/retained", True)]
+    # MQTT discovery subscribes to topics of its own
+    assert "test/#" in mqtt_broker.subscriptions
+    stats = mqtt_broker.stats()
+    assert (stats["retained"], stats["delivered"], stats["dropped"]) == (1, 1, 2)
@@ -0,0 +1,83 @@
+"""Tests for recorder db module."""
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.recorder import Recorder, core
+from homeassistant.components.recorder.db_schema import Base
+from homeassistant.core import HomeAssistant
+from sqlalchemy import inspect, text
+
+from pytest_homeassistant_custom_component.components.recorder import (
+    common as recorder_common,
+)
+from pytest_homeassistant_custom_component.components.recorder import db_schema_0
+from pytest_homeassistant_custom_component.recorder_db import (
+    create_engine_test_with_db_template,
+    create_engine_with_db_template,
+    get_db_template,
+    old_db_schema,
+)
+from pytest_homeassistant_custom_component.typing import RecorderInstanceContextManager
+
+
+@pytest.fixture
+def mock_recorder_before_hass(
+    async_test_recorder: RecorderInstanceContextManager,
+) -> None:
+    """Prepare the recorder database before the autouse fixtures set up hass."""
+
+
+def test_create_engine_with_db_template(tmp_path):
+    """Test new SQLite databases get the tables but no rows of the template."""
+    for db_url in ("sqlite://", f"sqlite:///{tmp_path / 'test.db'}"):
+        engine = create_engine_with_db_template(db_url)
+        assert set(inspect(engine).get_table_names()) == set(Base.metadata.tables)
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT * FROM states")).all() == []
+            connection.execute(text("INSERT INTO statistics_runs VALUES (1, '')"))
+            connection.commit()
+        engine.dispose()
+
+    # An existing database is left alone
+    engine = create_engine_with_db_template(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT * FROM statistics_runs")).all() == [
+            (1, "")
+        ]
+    engine.dispose()
+
+
+def test_create_engine_test_with_db_template():
+    """Test old schema databases are cloned from a template per schema module."""
+    engine = create_engine_test_with_db_template("sqlite://")
+    assert set(inspect(engine).get_table_names()) == set(
+        db_schema_0.Base.metadata.tables
+    )
+    engine.dispose()
+    assert get_db_template(db_schema_0.__name__) is get_db_template(
+        db_schema_0.__name__
+    )
+    assert get_db_template(db_schema_0.__name__) is not get_db_template(Base.__module__)
+
+
+async def test_old_db_schema(hass: HomeAssistant):
+    """Test old_db_schema clones the template of the old schema module."""
+    with (
+        patch.object(
+            recorder_common, "get_schema_module_path", return_value=Base.__module__
+        ),
+        old_db_schema(hass, "99"),
+    ):
+        engine = recorder_common.create_engine("sqlite://")
+    assert set(inspect(engine).get_table_names()) == set(Base.metadata.tables)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("recorder_db_template", [False, True])
+async def test_recorder_db_template(
+    recorder_mock: Recorder, recorder_db_template: bool
+):
+    """Test the recorder creates its engine with the template if enabled."""
+    assert (core.create_engine is create_engine_with_db_template) is (
+        recorder_db_template
+    )
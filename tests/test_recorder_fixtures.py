@@ -0,0 +1,82 @@
+"""Tests for recorder fixtures module."""
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.plugins import thread_session
+from pytest_homeassistant_custom_component.recorder_fixtures import (
+    RecorderSessions,
+    _is_recorder_temp_db,
+)
+from pytest_homeassistant_custom_component.typing import RecorderInstanceContextManager
+
+
+@pytest.fixture
+def mock_recorder_before_hass(
+    async_test_recorder: RecorderInstanceContextManager,
+) -> None:
+    """Prepare the recorder database before the autouse fixtures set up hass."""
+
+
+def test_recorder_sessions():
+    """Test recorder sessions are counted and sampled sessions can't be nested."""
+    recorder_sessions = RecorderSessions(2)
+    session = MagicMock()
+    with recorder_sessions.session_scope(session=session) as ses:
+        assert ses is session
+        # Every second session is checked, the first nested one is sampled
+        with pytest.raises(RuntimeError, match="already has an active session"):
+            recorder_sessions.session_scope(session=session)
+        recorder_sessions.session_scope(session=session)
+    with recorder_sessions.session_scope(session=session):
+        pass
+    # Sessions opened inside an unchecked session are caught too
+    with (
+        recorder_sessions.session_scope(session=session),
+        pytest.raises(RuntimeError, match="already has an active session"),
+    ):
+        recorder_sessions.session_scope(session=session)
+    assert recorder_sessions.opened == 6
+    assert session.commit.call_count == 3
+
+
+def test_recorder_sessions_restore_thread_mark():
+    """Test closing a nested session keeps the thread marked by the outer one."""
+    recorder_sessions = RecorderSessions(3)
+    session = MagicMock()
+    with recorder_sessions.session_scope(session=session):
+        # The second session is not sampled, closing it must not unmark the thread
+        with recorder_sessions.session_scope(session=session):
+            assert thread_session.has_session
+        assert thread_session.has_session
+        with pytest.raises(RuntimeError, match="already has an active session"):
+            recorder_sessions.session_scope(session=session)
+    assert not thread_session.has_session
+
+
+def test_is_recorder_temp_db(pytestconfig, tmp_path_factory, tmp_path):
+    """Test only SQLite databases created by recorder_db_url count as temporary."""
+    recorder_dir = tmp_path_factory.mktemp("recorder")
+    assert _is_recorder_temp_db(
+        f"sqlite:///{recorder_dir / 'pytest.db'}", pytestconfig, tmp_path_factory
+    )
+    assert not _is_recorder_temp_db(
+        f"sqlite:///{tmp_path / 'pytest.db'}", pytestconfig, tmp_path_factory
+    )
+    assert not _is_recorder_temp_db("sqlite://", pytestconfig, tmp_path_factory)
+
+
+@pytest.mark.parametrize("persistent_database", [True])
+async def test_recorder_sqlite_tuning(recorder_mock: Recorder, hass: HomeAssistant):
+    """Test on disk SQLite databases are tuned for tests."""
+
+    def get_pragmas() -> list[str | int]:
+        with recorder_mock.engine.connect() as connection:
+            return [
+                connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in ("journal_mode", "synchronous", "temp_store")
+            ]
+
+    assert await recorder_mock.async_add_executor_job(get_pragmas) == ["wal", 0, 2]
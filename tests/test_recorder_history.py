@@ -0,0 +1,317 @@
+"""Tests for recorder history module."""
+from datetime import timedelta
+from functools import partial
+
+import pytest
+from homeassistant.components.recorder import Recorder, history
+from homeassistant.components.recorder.db_schema import (
+    EventData,
+    Events,
+    StateAttributes,
+    States,
+)
+from homeassistant.core import Context, Event, HomeAssistant, State
+from homeassistant.helpers.recorder import session_scope
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    assert_dict_of_states_equal_without_context_and_last_changed,
+    db_event_to_native,
+    db_state_to_native,
+    statistics_during_period,
+)
+from pytest_homeassistant_custom_component.recorder_history import (
+    RecorderCommitTracker,
+    SyntheticHistory,
+    async_benchmark_statistics,
+    async_bulk_record_history,
+    async_record_states_batched,
+    benchmark_statistics_during_period,
+    db_event_batch_to_native,
+    db_event_data_batch_to_native,
+    db_state_attributes_batch_to_native,
+    db_state_batch_to_native,
+    record_states_batched,
+)
+from pytest_homeassistant_custom_component.typing import RecorderInstanceContextManager
+
+
+@pytest.fixture
+def mock_recorder_before_hass(
+    async_test_recorder: RecorderInstanceContextManager,
+) -> None:
+    """Prepare the recorder database before the autouse fixtures set up hass."""
+
+
+async def test_bulk_record_history(recorder_mock: Recorder, hass: HomeAssistant):
+    """Test synthetic history is written as states and hourly statistics."""
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(hours=3)
+    entity_ids = ["sensor.test1", "sensor.test2"]
+
+    assert await async_bulk_record_history(
+        hass,
+        entity_ids,
+        start,
+        end,
+        timedelta(minutes=10),
+        attributes={"unit_of_measurement": "°C"},
+        values=lambda entity_id, timestamps: timestamps % 3600 // 600,
+        record_statistics=True,
+    ) == SyntheticHistory(36, 6)
+
+    states = await recorder_mock.async_add_executor_job(
+        partial(
+            history.get_significant_states,
+            hass,
+            start - timedelta(seconds=1),
+            end,
+            entity_ids,
+            significant_changes_only=False,
+        )
+    )
+    assert [state.state for state in states["sensor.test1"][:7]] == [
+        "0.0",
+        "1.0",
+        "2.0",
+        "3.0",
+        "4.0",
+        "5.0",
+        "0.0",
+    ]
+    assert states["sensor.test2"][-1].attributes == {"unit_of_measurement": "°C"}
+
+    stats = await recorder_mock.async_add_executor_job(
+        statistics_during_period, hass, start, end, entity_ids
+    )
+    assert [(row["mean"], row["min"], row["max"]) for row in stats["sensor.test1"]] == [
+        (2.5, 0.0, 5.0)
+    ] * 3
+
+
+async def test_bulk_record_history_reuses_attributes(
+    recorder_mock: Recorder, hass: HomeAssistant
+):
+    """Test repeated calls with the same attributes share one attributes row."""
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    for entity_id in ("sensor.test1", "sensor.test2"):
+        await async_bulk_record_history(
+            hass,
+            [entity_id],
+            end - timedelta(hours=1),
+            end,
+            timedelta(minutes=10),
+            attributes={"unit_of_measurement": "°C"},
+        )
+
+    def _count_attributes() -> int:
+        with session_scope(hass=hass, read_only=True) as session:
+            return session.query(StateAttributes).count()
+
+    assert await recorder_mock.async_add_executor_job(_count_attributes) == 1
+
+
+async def test_bulk_record_history_reported_states(
+    recorder_mock: Recorder, hass: HomeAssistant
+):
+    """Test repeated states are reported on their row, linked to the previous row."""
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(hours=1)
+    start_ts = start.timestamp()
+    for _ in range(2):
+        # Each hour reports 0 three times, then 1 three times
+        assert await async_bulk_record_history(
+            hass,
+            ["sensor.test"],
+            start,
+            end,
+            timedelta(minutes=10),
+            values=lambda entity_id, timestamps: timestamps % 3600 // 1800,
+        ) == SyntheticHistory(2, 0)
+        start, end = end, end + timedelta(hours=1)
+
+    def _get_states() -> list[tuple]:
+        with session_scope(hass=hass, read_only=True) as session:
+            return [
+                (
+                    state.state_id,
+                    state.old_state_id,
+                    state.state,
+                    state.last_updated_ts,
+                    state.last_reported_ts,
+                )
+                for state in session.query(States).order_by(States.state_id)
+            ]
+
+    states = await recorder_mock.async_add_executor_job(_get_states)
+    assert [state[2:] for state in states] == [
+        ("0.0", start_ts, start_ts + 1200),
+        ("1.0", start_ts + 1800, start_ts + 3000),
+        ("0.0", start_ts + 3600, start_ts + 4800),
+        ("1.0", start_ts + 5400, start_ts + 6600),
+    ]
+    # Only the states of a call are linked
+    assert [state[1] for state in states] == [
+        None,
+        states[0][0],
+        None,
+        states[2][0],
+    ]
+
+
+@pytest.mark.parametrize("in_executor", [False, True])
+async def test_record_states_batched(
+    recorder_mock: Recorder, hass: HomeAssistant, in_executor: bool
+):
+    """Test the recorded states match the returned states."""
+    if in_executor:
+        zero, four, states = await hass.async_add_executor_job(
+            record_states_batched, hass
+        )
+    else:
+        zero, four, states = await async_record_states_batched(hass)
+
+    hist = await recorder_mock.async_add_executor_job(
+        partial(history.get_significant_states, hass, zero, four, list(states))
+    )
+    assert_dict_of_states_equal_without_context_and_last_changed(states, hist)
+
+
+async def test_recorder_commit_tracker(
+    recorder_commit_tracker: RecorderCommitTracker, hass: HomeAssistant
+):
+    """Test waiting for the recorder to commit states."""
+    contexts = []
+    for state in range(5):
+        hass.states.async_set("sensor.test", str(state))
+        contexts.append(hass.states.get("sensor.test").context)
+    await recorder_commit_tracker.async_wait(*contexts)
+
+    states = await hass.async_add_executor_job(
+        partial(
+            history.state_changes_during_period,
+            hass,
+            dt_util.utcnow() - timedelta(minutes=1),
+            entity_id="sensor.test",
+        )
+    )
+    assert [state.state for state in states["sensor.test"]] == ["0", "1", "2", "3", "4"]
+    assert recorder_commit_tracker.committed_events >= 5
+    assert recorder_commit_tracker.waits == 1
+
+    # Waiting for a committed context returns immediately
+    await recorder_commit_tracker.async_wait(contexts[0])
+    assert recorder_commit_tracker.waits == 2
+
+
+def test_db_batch_to_native():
+    """Test the batch converters match the per row converters."""
+    states = [
+        States.from_event(
+            Event(
+                "state_changed",
+                {
+                    "entity_id": "sensor.test",
+                    "new_state": State("sensor.test", str(value), context=Context()),
+                },
+            )
+        )
+        for value in range(10)
+    ]
+    for value, state in enumerate(states[1:5], 1):
+        state.attributes = f'{{"value":{value % 3}}}'
+    shared_attrs = {}
+    for value, state in enumerate(states[5:], 5):
+        state.attributes_id = value
+        shared_attrs[value] = f'{{"value":{value % 3}}}'
+
+    expected = [db_state_to_native(state).as_dict() for state in states[:5]]
+    converted = db_state_batch_to_native(states[:5], chunk_size=2)
+    assert [state.as_dict() for state in converted] == expected
+    converted = list(db_state_batch_to_native(states, shared_attrs, chunk_size=4))
+    assert [state.as_dict() for state in converted[:5]] == expected
+    assert [state.attributes for state in converted[5:]] == [
+        {"value": value % 3} for value in range(5, 10)
+    ]
+    assert converted[2].attributes is converted[5].attributes
+
+    event_data = [f'{{"value":{value % 2}}}' for value in range(4)]
+    events = []
+    for data in event_data:
+        event = Events.from_event(Event("test_event", context=Context()))
+        event.event_data = data
+        events.append(event)
+    converted = list(db_event_batch_to_native(events, validate_entity_id=False))
+    assert [event.as_dict() for event in converted] == [
+        db_event_to_native(event).as_dict() for event in events
+    ]
+    assert converted[0].data is converted[2].data
+
+    data = list(
+        db_event_data_batch_to_native(
+            EventData(shared_data=shared_data) for shared_data in (*event_data, None)
+        )
+    )
+    assert data == [{"value": 0}, {"value": 1}, {"value": 0}, {"value": 1}, {}]
+    attrs = list(
+        db_state_attributes_batch_to_native(
+            StateAttributes(shared_attrs=shared_attrs[attributes_id])
+            for attributes_id in (5, 8)
+        )
+    )
+    assert attrs == [{"value": 2}, {"value": 2}]
+    assert attrs[0] is attrs[1]
+
+    with pytest.raises(ValueError):
+        list(db_event_data_batch_to_native([EventData(shared_data="[]")]))
+
+
+async def test_benchmark_statistics(
+    recorder_mock: Recorder, hass: HomeAssistant, tmp_path
+):
+    """Test the statistics benchmark report."""
+    report_path = tmp_path / "report.json"
+    report = await async_benchmark_statistics(
+        hass,
+        report_path,
+        statistic_ids=3,
+        days=2,
+        short_term_days=1,
+        periods=("5minute", "hour"),
+        repeat=1,
+    )
+    assert json_loads(report_path.read_bytes()) == report
+    assert report["statistics"] == 3 * 48
+    assert report["short_term_statistics"] == 3 * 288
+    assert [
+        (result["period"], result["units"], result["statistic_ids"], result["rows"])
+        for result in report["results"]
+    ] == [
+        ("5minute", None, 1, 288),
+        ("5minute", None, 3, 3 * 288),
+        ("5minute", {"temperature": "°F"}, 1, 288),
+        ("5minute", {"temperature": "°F"}, 3, 3 * 288),
+        ("hour", None, 1, 48),
+        ("hour", None, 3, 3 * 48),
+        ("hour", {"temperature": "°F"}, 1, 48),
+        ("hour", {"temperature": "°F"}, 3, 3 * 48),
+    ]
+
+
+async def test_benchmark_statistics_invalid_repeat(
+    recorder_mock: Recorder, hass: HomeAssistant
+):
+    """Test the statistics benchmark rejects a repeat below 1."""
+    end = dt_util.utcnow()
+    with pytest.raises(ValueError, match="repeat must be at least 1"):
+        await recorder_mock.async_add_executor_job(
+            partial(
+                benchmark_statistics_during_period,
+                hass,
+                end - timedelta(hours=1),
+                end,
+                ["sensor.test1"],
+                repeat=0,
+            )
+        )
@@ -0,0 +1,46 @@
+"""Tests for the restore state cache helpers."""
+from typing import Any
+
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import restore_state as rs
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.restore_state import (
+    async_benchmark_restore_state_restarts,
+    build_restore_cache,
+    generate_restore_states,
+    mock_restore_cache_bulk,
+)
+
+
+async def test_mock_restore_cache_bulk(hass: HomeAssistant) -> None:
+    """Test shared restore cache entries are copied per test."""
+    last_states = build_restore_cache(
+        (State(f"sensor.test_{i}", str(i), {"when": dt_util.utcnow()}), None)
+        if i % 2
+        else (State(f"sensor.test_{i}", str(i)), {"native_value": i})
+        for i in range(100)
+    )
+    data = mock_restore_cache_bulk(hass, last_states)
+    data.last_states.pop("sensor.test_1")
+
+    assert len(last_states) == 100
+    assert rs.async_get(hass) is data
+    assert isinstance(last_states["sensor.test_1"].state.attributes["when"], str)
+    assert last_states["sensor.test_2"].extra_data.as_dict() == {"native_value": 2}
+
+
+async def test_async_benchmark_restore_state_restarts(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test measuring restore state shutdown and restart cycles."""
+    mock_restore_cache_bulk(
+        hass, generate_restore_states(50, {"values": list(range(10))})
+    )
+    results = await async_benchmark_restore_state_restarts(hass, hass_storage, 2)
+
+    assert len(results) == 2
+    assert results[0].entities == results[1].entities == 50
+    assert results[0].stored_bytes == results[1].stored_bytes
+    assert results[0].largest_entity_id is not None
+    assert results[0].bytes_per_entity > results[0].largest_entity_bytes / 2
@@ -0,0 +1,123 @@
+"""Tests for the batched platform snapshots."""
+import pytest
+from homeassistant.core import State
+
+from pytest_homeassistant_custom_component.snapshot_platform import (
+    _assert_platform_snapshot,
+    _split_platform_snapshot,
+)
+from pytest_homeassistant_custom_component.syrupy import (
+    HomeAssistantSnapshotSerializer,
+)
+
+pytest_plugins = ["pytester"]
+
+
+def test_split_platform_snapshot() -> None:
+    """Test a serialized platform snapshot is split per entity."""
+    serialized = HomeAssistantSnapshotSerializer.serialize(
+        {
+            "sensor.one": {"state": State("sensor.one", "on")},
+            "sensor.two": {"state": State("sensor.two", "off", {"key": "'quoted'"})},
+        }
+    )
+    entities = _split_platform_snapshot(serialized)
+
+    assert list(entities) == ["sensor.one", "sensor.two"]
+    assert entities["sensor.one"].startswith("  'sensor.one': dict({")
+    assert "'state': 'on'" in entities["sensor.one"]
+    assert "'state': 'off'" in entities["sensor.two"]
+    assert "'key': \"'quoted'\"" in entities["sensor.two"]
+    assert "\n".join(["dict({", *entities.values(), "})"]) == serialized
+
+
+def test_assert_platform_snapshot_without_syrupy_results() -> None:
+    """Test a mismatch still fails when syrupy doesn't expose its results."""
+
+    class _Assertion:
+        def __call__(self, *, name: str) -> "_Assertion":
+            return self
+
+        def __eq__(self, other: object) -> bool:
+            return False
+
+    with pytest.raises(AssertionError):
+        _assert_platform_snapshot(_Assertion(), "sensor-platform", {})
+
+
+_PLATFORM_TEST = """
+import os
+
+from homeassistant.helpers import entity_registry as er
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.snapshot_platform import (
+    snapshot_platform,
+)
+from pytest_homeassistant_custom_component.syrupy import (
+    HomeAssistantSnapshotExtension,
+)
+
+
+async def test_platform(hass, entity_registry, snapshot):
+    entry = MockConfigEntry(domain="test", entry_id="01TESTENTRY")
+    entry.add_to_hass(hass)
+    for object_id in ("one", "two", "three"):
+        entity_registry.async_get_or_create(
+            "sensor", "test", object_id, config_entry=entry,
+            suggested_object_id=object_id,
+        )
+    hass.states.async_set("sensor.one", "on")
+    hass.states.async_set("sensor.two", os.environ.get("SENSOR_TWO_STATE", "on"))
+    hass.states.async_set("sensor.three", "on")
+    await snapshot_platform(
+        hass,
+        entity_registry,
+        snapshot.use_extension(HomeAssistantSnapshotExtension),
+        entry.entry_id,
+        batched=True,
+    )
+"""
+
+
+def test_snapshot_platform_batched(
+    pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the batched platform snapshot is created, matched and diffed."""
+    pytester.makeini(
+        "[pytest]\n"
+        "asyncio_mode = auto\n"
+        "asyncio_default_fixture_loop_scope = function\n"
+    )
+    pytester.makepyfile(test_platform=_PLATFORM_TEST)
+    snapshot_file = pytester.path / "snapshots" / "test_platform.ambr"
+
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*Snapshot 'sensor-platform' does not exist!*"])
+
+    result = pytester.runpytest_subprocess("--snapshot-update")
+    result.assert_outcomes(passed=1)
+    assert "# name: test_platform[sensor-platform]" in snapshot_file.read_text()
+
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=1)
+
+    monkeypatch.setenv("SENSOR_TWO_STATE", "off")
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*Snapshot 'sensor-platform' mismatch for 1 of 3 entities",
+            "--- snapshot sensor.two",
+            "+++ received sensor.two",
+            "*-      'state': 'on',",
+            "*+      'state': 'off',",
+        ]
+    )
+    assert "snapshot sensor.one" not in result.stdout.str()
+    assert "snapshot sensor.three" not in result.stdout.str()
+
+    result = pytester.runpytest_subprocess("--snapshot-update")
+    result.assert_outcomes(passed=1)
+    assert "'state': 'off'" in snapshot_file.read_text()
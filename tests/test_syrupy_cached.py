@@ -0,0 +1,127 @@
+"""Tests for the cached snapshot serializer."""
+import dataclasses
+from enum import IntFlag
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from homeassistant.core import State
+
+from pytest_homeassistant_custom_component import syrupy_cached
+from pytest_homeassistant_custom_component.syrupy import (
+    HomeAssistantSnapshotSerializer,
+)
+from pytest_homeassistant_custom_component.syrupy_cached import (
+    _TYPE_PREPROCESSORS,
+    CachedHomeAssistantSnapshotSerializer,
+)
+
+pytest_plugins = ["pytester"]
+
+
+class _Feature(IntFlag):
+    """Test feature flags."""
+
+    ONE = 1
+    TWO = 2
+
+
+@dataclasses.dataclass
+class _Data:
+    """Test dataclass."""
+
+    value: int
+
+
+def test_serializer_preprocessors() -> None:
+    """Test values are preprocessed depending on their type and keys."""
+    serialized = CachedHomeAssistantSnapshotSerializer.serialize(
+        {
+            "state": State("sensor.test", "on"),
+            "flow": {"flow_id": "abc", "handler": "test"},
+            "features": _Feature.ONE | _Feature.TWO,
+            "data": [_Data(1), _Data(2)],
+        }
+    )
+
+    assert "StateSnapshot" in serialized
+    assert "FlowResultSnapshot" in serialized
+    assert "'abc'" not in serialized
+    assert "<_Feature: 3>" in serialized
+    assert "'value': 2" in serialized
+
+
+def test_serializer_preprocessors_not_cached_for_mocks() -> None:
+    """Test the per type preprocessor cache does not grow with mocks."""
+    CachedHomeAssistantSnapshotSerializer.serialize([MagicMock(), AsyncMock()])
+    cached_types = len(_TYPE_PREPROCESSORS)
+    CachedHomeAssistantSnapshotSerializer.serialize([MagicMock() for _ in range(10)])
+    assert len(_TYPE_PREPROCESSORS) == cached_types
+
+
+def test_serializer_matches_the_generated_serializer() -> None:
+    """Test the cached serializer gives the snapshots of the generated one."""
+    data = {
+        "state": State("sensor.test", "on", {"unit": "W"}),
+        "flow": {"flow_id": "abc", "handler": "test", "data": {"key": "value"}},
+        "conversation": {
+            "conversation_id": "abc",
+            "response": "ok",
+            "continue_conversation": False,
+        },
+        "features": _Feature.ONE | _Feature.TWO,
+        "data": [_Data(1), _Data(2)],
+    }
+
+    assert CachedHomeAssistantSnapshotSerializer.serialize(
+        data
+    ) == HomeAssistantSnapshotSerializer.serialize(data)
+
+
+def test_serializer_spec_mocks() -> None:
+    """Test mocks with a spec are preprocessed like the class they spec."""
+    state = Mock(spec=State)
+    state.entity_id = "sensor.test"
+    state.state = "on"
+    state.attributes = {}
+    state.context = None
+
+    with patch.object(
+        CachedHomeAssistantSnapshotSerializer,
+        "_serializable_state",
+        return_value={"state": "on"},
+    ) as serializable_state:
+        CachedHomeAssistantSnapshotSerializer.serialize(state)
+
+    serializable_state.assert_called_once_with(state)
+
+
+def test_serializer_preprocessors_cache_size() -> None:
+    """Test the per type preprocessor cache is emptied when full."""
+    with (
+        patch.object(syrupy_cached, "_TYPE_PREPROCESSORS", {}) as cache,
+        patch.object(syrupy_cached, "_TYPE_PREPROCESSORS_MAX_SIZE", 2),
+    ):
+        CachedHomeAssistantSnapshotSerializer.serialize([1, "two", 3.0, _Data(4)])
+        assert 0 < len(cache) <= 2
+
+
+def test_snapshot_fixture(pytester: pytest.Pytester) -> None:
+    """Test the snapshot fixture uses the cached extension."""
+    pytester.makeini(
+        "[pytest]\n"
+        "asyncio_mode = auto\n"
+        "asyncio_default_fixture_loop_scope = function\n"
+    )
+    pytester.makepyfile(
+        """
+        from pytest_homeassistant_custom_component.syrupy_cached import (
+            CachedHomeAssistantSnapshotExtension,
+        )
+
+
+        def test_snapshot(snapshot):
+            assert snapshot.extension_class is CachedHomeAssistantSnapshotExtension
+        """
+    )
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=1)
@@ -0,0 +1,138 @@
+"""Tests for the compact snapshot storage."""
+import pathlib
+
+import pytest
+from syrupy.data import Snapshot, SnapshotCollection
+
+from pytest_homeassistant_custom_component.syrupy import (
+    HomeAssistantSnapshotExtension,
+)
+from pytest_homeassistant_custom_component.syrupy_compact import (
+    HomeAssistantCompactSnapshotExtension,
+    convert_amber_snapshots,
+)
+
+pytest_plugins = ["pytester"]
+
+
+def test_convert_amber_snapshots(tmp_path: pathlib.Path) -> None:
+    """Test converting amber files and reading single snapshots back."""
+    amber_file = tmp_path / "test_module.ambr"
+    serializer_class = HomeAssistantSnapshotExtension.serializer_class
+    amber_file.write_text(
+        f"# serializer version: {serializer_class.VERSION}\n"
+        "# name: test_one\n"
+        "  dict({\n"
+        "    'key': 'value',\n"
+        "  })\n"
+        "# ---\n"
+        "# name: test_two\n"
+        "  'two'\n"
+        "# ---\n"
+    )
+
+    assert convert_amber_snapshots(tmp_path, remove=True) == [
+        tmp_path / "test_module.hasnap"
+    ]
+    assert not amber_file.exists()
+
+    extension = HomeAssistantCompactSnapshotExtension()
+    location = str(tmp_path / "test_module.hasnap")
+    collection = extension.read_snapshot_collection(snapshot_location=location)
+    assert sorted(snapshot.name for snapshot in collection) == ["test_one", "test_two"]
+    assert not collection.tainted
+    assert (
+        extension.read_snapshot_data_from_location(
+            snapshot_location=location, snapshot_name="test_one", session_id="1"
+        )
+        == "dict({\n  'key': 'value',\n})"
+    )
+
+    extension.delete_snapshots(snapshot_location=location, snapshot_names={"test_one"})
+    assert (
+        extension.read_snapshot_data_from_location(
+            snapshot_location=location, snapshot_name="test_two", session_id="2"
+        )
+        == "'two'"
+    )
+    extension.delete_snapshots(snapshot_location=location, snapshot_names={"test_two"})
+    assert not (tmp_path / "test_module.hasnap").exists()
+
+
+def test_write_drops_cached_headers(tmp_path: pathlib.Path) -> None:
+    """Test snapshots written during a session are read back."""
+    location = str(tmp_path / "test_module.hasnap")
+    extension = HomeAssistantCompactSnapshotExtension()
+
+    for data in ("'one'", "'a longer value than the first one'"):
+        collection = SnapshotCollection(location=location)
+        collection.add(Snapshot(name="test_one", data=data))
+        extension.write_snapshot_collection(
+            snapshot_collection=collection, name_order={"test_one": 0}
+        )
+        assert (
+            extension.read_snapshot_data_from_location(
+                snapshot_location=location, snapshot_name="test_one", session_id="1"
+            )
+            == data
+        )
+
+    extension.delete_snapshots(snapshot_location=location, snapshot_names={"test_one"})
+    assert (
+        extension.read_snapshot_data_from_location(
+            snapshot_location=location, snapshot_name="test_one", session_id="1"
+        )
+        is None
+    )
+
+
+_COMPACT_SNAPSHOT_TEST = """
+import os
+
+
+def test_one(compact_snapshot):
+    assert {"key": os.environ.get("SNAPSHOT_VALUE", "value")} == compact_snapshot
+
+
+def test_two(compact_snapshot):
+    assert "two" == compact_snapshot(name="two")
+"""
+
+
+def test_compact_snapshot(
+    pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test snapshots are written, matched and updated in a compact file."""
+    pytester.makeini(
+        "[pytest]\n"
+        "asyncio_mode = auto\n"
+        "asyncio_default_fixture_loop_scope = function\n"
+    )
+    pytester.makepyfile(test_compact=_COMPACT_SNAPSHOT_TEST)
+    snapshot_file = pytester.path / "snapshots" / "test_compact.hasnap"
+
+    result = pytester.runpytest_subprocess("--snapshot-update")
+    result.assert_outcomes(passed=2)
+    assert snapshot_file.exists()
+
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=2)
+
+    monkeypatch.setenv("SNAPSHOT_VALUE", "changed")
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=1, failed=1)
+
+    result = pytester.runpytest_subprocess("--snapshot-update")
+    result.assert_outcomes(passed=2)
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=2)
+
+    # Unused snapshots are removed from the file
+    test_one = _COMPACT_SNAPSHOT_TEST[: _COMPACT_SNAPSHOT_TEST.index("def test_two")]
+    pytester.makepyfile(test_compact=test_one)
+    result = pytester.runpytest_subprocess("--snapshot-update")
+    result.assert_outcomes(passed=1)
+    collection = HomeAssistantCompactSnapshotExtension().read_snapshot_collection(
+        snapshot_location=str(snapshot_file)
+    )
+    assert [snapshot.name for snapshot in collection] == ["test_one"]
@@ -0,0 +1,177 @@
+"""Tests for the translations_cache module."""
+import json
+import threading
+
+import pytest
+
+from pytest_homeassistant_custom_component.shared_cache import SharedCache
+from pytest_homeassistant_custom_component.translations_cache import (
+    PersistentTranslationsCache,
+    SharedTranslationsCache,
+    cached_load_translations_files,
+)
+
+pytest_plugins = ["pytester"]
+
+
+def _load_translations_files(loaded_files):
+    """Return a translation files loader which records the loaded files."""
+
+    def load_translations_files(translation_files):
+        loaded_files.append(translation_files)
+        return {
+            language: {
+                component: json.loads(path.read_text())
+                for component, path in files.items()
+            }
+            for language, files in translation_files.items()
+        }
+
+    return load_translations_files
+
+
+def test_shared_load_translations_files(tmp_path):
+    """Test translation files are only parsed once when shared."""
+    translation_file = tmp_path / "en.json"
+    translation_file.write_text(json.dumps({"title": "Simple"}))
+    loaded_files = []
+    shared_cache = SharedCache(tmp_path / "shared")
+    load = cached_load_translations_files(
+        [SharedTranslationsCache(shared_cache)],
+        _load_translations_files(loaded_files),
+    )
+    translation_files = {"en": {"simple_integration": translation_file}}
+
+    assert load(translation_files) == {
+        "en": {"simple_integration": {"title": "Simple"}}
+    }
+    assert load(translation_files) == {
+        "en": {"simple_integration": {"title": "Simple"}}
+    }
+    assert len(loaded_files) == 1
+    assert shared_cache.hits == 1
+
+    # A file changed during the run is parsed again
+    translation_file.write_text(json.dumps({"title": "Simple integration"}))
+    assert load(translation_files) == {
+        "en": {"simple_integration": {"title": "Simple integration"}}
+    }
+    assert len(loaded_files) == 2
+
+
+def test_persistent_translations_cache(tmp_path):
+    """Test translation files are persisted and invalidated when modified."""
+    translation_file = tmp_path / "en.json"
+    translation_file.write_text(json.dumps({"title": "Simple"}))
+    cache_file = tmp_path / "translations.cache"
+    translation_files = {"en": {"simple_integration": translation_file}}
+    loaded_files = []
+
+    cache = PersistentTranslationsCache(cache_file, "2026.8.3")
+    load = cached_load_translations_files(
+        [cache], _load_translations_files(loaded_files)
+    )
+    load(translation_files)
+    cache.save()
+    assert cache.stats()["translations_cache_misses"] == 1
+
+    cache = PersistentTranslationsCache(cache_file, "2026.8.3")
+    load = cached_load_translations_files(
+        [cache], _load_translations_files(loaded_files)
+    )
+    assert load(translation_files) == {
+        "en": {"simple_integration": {"title": "Simple"}}
+    }
+    assert cache.stats()["translations_cache_hits"] == 1
+    assert len(loaded_files) == 1
+
+    translation_file.write_text(json.dumps({"title": "Simple integration"}))
+    assert load(translation_files) == {
+        "en": {"simple_integration": {"title": "Simple integration"}}
+    }
+    assert cache.stats()["translations_cache_invalidated"] == 1
+
+    cache = PersistentTranslationsCache(cache_file, "2026.9.0")
+    assert cache.get(translation_file) is None
+
+
+def test_persistent_translations_cache_concurrent_save(tmp_path):
+    """Test entries saved by concurrent processes are merged."""
+    fcntl = pytest.importorskip("fcntl")
+    cache_file = tmp_path / "translations.cache"
+    first_file = tmp_path / "en.json"
+    second_file = tmp_path / "de.json"
+    caches = [
+        PersistentTranslationsCache(cache_file, "2026.8.3"),
+        PersistentTranslationsCache(cache_file, "2026.8.3"),
+    ]
+    for cache, translation_file in zip(caches, (first_file, second_file)):
+        translation_file.write_text(json.dumps({"title": translation_file.stem}))
+        assert cache.get(translation_file) is None
+        cache.set(translation_file, {"title": translation_file.stem})
+    caches[0].save()
+    # The second save waits for the lock held by another process
+    with (tmp_path / "translations.cache.lock").open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        save = threading.Thread(target=caches[1].save)
+        save.start()
+        save.join(0.2)
+        assert save.is_alive()
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    save.join()
+
+    cache = PersistentTranslationsCache(cache_file, "2026.8.3")
+    assert cache.get(first_file) == {"title": "en"}
+    assert cache.get(second_file) == {"title": "de"}
+
+
+def test_persistent_translations_cache_prunes_stale_entries(tmp_path):
+    """Test entries of removed or changed translation files are not saved."""
+    cache_file = tmp_path / "translations.cache"
+    translation_files = [tmp_path / f"{language}.json" for language in "abc"]
+    cache = PersistentTranslationsCache(cache_file, "2026.8.3")
+    for translation_file in translation_files:
+        translation_file.write_text(json.dumps({"title": translation_file.stem}))
+        cache.set(translation_file, {"title": translation_file.stem})
+    cache.save()
+
+    translation_files[0].unlink()
+    translation_files[1].write_text(json.dumps({"title": "changed"}))
+    cache = PersistentTranslationsCache(cache_file, "2026.8.3")
+    new_file = tmp_path / "d.json"
+    new_file.write_text(json.dumps({"title": "d"}))
+    cache.set(new_file, {"title": "d"})
+    cache.save()
+
+    assert set(cache._read()) == {str(translation_files[2]), str(new_file)}
+
+
+def test_translations_cache_option(pytester: pytest.Pytester):
+    """Test --translations-cache persists the translations loaded by tests."""
+    pytester.makeini(
+        "[pytest]\n"
+        "asyncio_mode = auto\n"
+        "asyncio_default_fixture_loop_scope = function\n"
+    )
+    pytester.makepyfile(
+        """
+        from homeassistant.helpers.translation import async_get_translations
+
+        async def test_translations(hass):
+            await async_get_translations(hass, "en", "entity", {"sensor"})
+        """
+    )
+    cache_file = pytester.path / "translations.cache"
+
+    result = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider", f"--translations-cache={cache_file}"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*translations cache*", "0 hits, * misses, *"])
+    assert cache_file.exists()
+
+    result = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider", f"--translations-cache={cache_file}"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["* hits, 0 misses, *"])